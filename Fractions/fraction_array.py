@@ -0,0 +1,223 @@
+import operator
+
+import numpy as np
+
+from Fractions.fractions import Fraction
+
+INT64_SAFE = float(2 ** 61)  # Products below this (with float slack) can't overflow int64, nor can a sum of two
+INT64_MIN = np.iinfo(np.int64).min  # The one int64 whose negation (and absolute value, in np.gcd) wraps
+
+
+def _as_integer_array(values):
+    """values as an int64 array, or as an object array of Python ints if some of them don't fit int64."""
+    array = np.asarray(values)
+    if array.dtype.kind == "f" and not isinstance(values, np.ndarray):
+        array = np.array(values, dtype=object)  # Python ints past int64 that NumPy inferred as floats
+
+    if array.dtype.kind in "ib" or (array.dtype.kind == "u" and (array.size == 0 or array.max() < 2 ** 63)):
+        return array.astype(np.int64)
+    if array.dtype.kind == "u" or array.dtype == object:
+        return _python_ints(array)
+    raise TypeError(f"FractionArray needs integer components, got {array.dtype}")
+
+
+def _python_ints(array):
+    try:
+        flat = [operator.index(x) for x in array.ravel().tolist()]
+    except TypeError:
+        raise TypeError("FractionArray needs integer components") from None
+
+    if all(-2 ** 63 <= x < 2 ** 63 for x in flat):
+        return np.array(flat, dtype=np.int64).reshape(array.shape)
+    return np.array(flat, dtype=object).reshape(array.shape)
+
+
+def _promote(*arrays):
+    """All arrays as int64 if they all are, else as object arrays of Python ints (arbitrary precision)."""
+    if any(array.dtype == object for array in arrays):
+        return tuple(array.astype(object) for array in arrays)
+    return arrays
+
+
+def _products_fit(*pairs):
+    """True if every elementwise product x * y of the given int64 pairs stays well inside int64."""
+    for x, y in pairs:
+        if x.dtype == object:
+            return True
+        if x.size and y.size and np.max(np.abs(x.astype(np.float64)) * np.abs(y.astype(np.float64))) >= INT64_SAFE:
+            return False
+    return True
+
+
+def _normalize(numerators, denominators):
+    """Moves signs onto the numerators and divides out common factors, elementwise."""
+    if np.any(denominators == 0):
+        raise ZeroDivisionError("FractionArray with a zero denominator")
+    if numerators.dtype != object and (np.any(numerators == INT64_MIN) or np.any(denominators == INT64_MIN)):
+        numerators, denominators = numerators.astype(object), denominators.astype(object)
+
+    sign = np.where(denominators < 0, -1, 1)
+    numerators, denominators = numerators * sign, denominators * sign
+
+    g = np.gcd(numerators, denominators)  # Denominators are nonzero, so g is too
+    return numerators // g, denominators // g
+
+
+def _from_normalized(numerators, denominators):
+    array = object.__new__(FractionArray)
+    array.numerators = numerators
+    array.denominators = denominators
+    return array
+
+
+class FractionArray:
+    """
+    An n-dimensional array of fractions stored as two parallel integer arrays (numerators, denominators),
+    always reduced with positive denominators. Operations are vectorized and broadcast like NumPy; storage is
+    int64 until a result could overflow, after which it is promoted to object arrays of Python ints.
+    """
+
+    __slots__ = ("numerators", "denominators")
+    __array_ufunc__ = None  # ndarray op FractionArray defers to the reflected operators here
+
+    def __init__(self, numerators, denominators=1):
+        numerators, denominators = _promote(_as_integer_array(numerators), _as_integer_array(denominators))
+        numerators, denominators = (np.array(array) for array in np.broadcast_arrays(numerators, denominators))
+        self.numerators, self.denominators = _normalize(numerators, denominators)
+
+    @classmethod
+    def from_fractions(cls, values):
+        """From a (nested) sequence of Fractions and ints, e.g. a matrix built by fractify."""
+        fractions = np.array(values, dtype=object)
+        numerators = np.vectorize(lambda x: Fraction(x).numerator, otypes=[object])(fractions)
+        denominators = np.vectorize(lambda x: Fraction(x).denominator, otypes=[object])(fractions)
+
+        array = cls(numerators, denominators)
+        if all(abs(int(x)) < 2 ** 63 for x in np.concatenate((array.numerators.ravel(), array.denominators.ravel()))):
+            return _from_normalized(array.numerators.astype(np.int64), array.denominators.astype(np.int64))
+        return array
+
+    @property
+    def shape(self):
+        return self.numerators.shape
+
+    @property
+    def dtype(self):
+        return self.numerators.dtype
+
+    @property
+    def decimal(self):
+        return self.numerators / self.denominators if self.dtype != object else \
+            np.vectorize(lambda n, d: n / d, otypes=[np.float64])(self.numerators, self.denominators)
+
+    def reduce(self):
+        return self  # Kept normalized by every operation
+
+    def tolist(self):
+        return np.vectorize(Fraction, otypes=[object])(self.numerators, self.denominators).tolist()
+
+    def __len__(self):
+        return len(self.numerators)
+
+    def __getitem__(self, item):
+        numerators, denominators = self.numerators[item], self.denominators[item]
+        if np.ndim(numerators) == 0:
+            return Fraction(int(numerators), int(denominators))
+        return _from_normalized(numerators, denominators)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    @staticmethod
+    def _coerce(other):
+        if isinstance(other, FractionArray):
+            return other.numerators, other.denominators
+        if isinstance(other, Fraction):
+            other = (other.numerator, other.denominator)
+        elif isinstance(other, (int, np.integer, np.ndarray)):
+            other = (other, 1)
+        else:
+            return None
+
+        return _promote(*(_as_integer_array(component) for component in other))
+
+    def __mul__(self, other):
+        coerced = self._coerce(other)
+        if coerced is None:
+            return NotImplemented
+
+        a, b, c, d = _promote(self.numerators, self.denominators, *coerced)
+        g1, g2 = np.gcd(a, d), np.gcd(c, b)  # Nonzero since b and d are
+        a, d, c, b = a // g1, d // g1, c // g2, b // g2
+
+        if not _products_fit((a, c), (b, d)):
+            a, b, c, d = _promote(a.astype(object), b, c, d)
+        return _from_normalized(*_normalize(a * c, b * d))
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __truediv__(self, other):
+        coerced = self._coerce(other)
+        if coerced is None:
+            return NotImplemented
+
+        c, d = coerced
+        if np.any(c == 0):
+            raise ZeroDivisionError("FractionArray division by zero")
+        return self.__mul__(_from_normalized(*_normalize(*np.broadcast_arrays(d, c))))
+
+    def __rtruediv__(self, other):
+        coerced = self._coerce(other)
+        if coerced is None:
+            return NotImplemented
+        if np.any(self.numerators == 0):
+            raise ZeroDivisionError("FractionArray division by zero")
+
+        return _from_normalized(*coerced).__mul__(_from_normalized(*_normalize(self.denominators, self.numerators)))
+
+    def __add__(self, other):
+        coerced = self._coerce(other)
+        if coerced is None:
+            return NotImplemented
+
+        a, b, c, d = _promote(self.numerators, self.denominators, *coerced)
+        g = np.gcd(b, d)
+        s, t = d // g, b // g
+
+        if not _products_fit((a, s), (c, t), (b, s)):
+            a, b, c, d = _promote(a.astype(object), b, c, d)
+            g = np.gcd(b, d)
+            s, t = d // g, b // g
+        return _from_normalized(*_normalize(a * s + c * t, b * s))
+
+    def __radd__(self, other):
+        return self.__add__(other)
+
+    def __neg__(self):
+        return _from_normalized(-self.numerators, self.denominators)
+
+    def __sub__(self, other):
+        coerced = self._coerce(other)
+        if coerced is None:
+            return NotImplemented
+        return self.__add__(_from_normalized(-coerced[0], coerced[1]))
+
+    def __rsub__(self, other):
+        return self.__neg__().__add__(other)
+
+    def __eq__(self, other):
+        coerced = self._coerce(other)
+        if coerced is None:
+            return NotImplemented
+
+        c, d = _normalize(*np.broadcast_arrays(*coerced))
+        return (self.numerators == c) & (self.denominators == d)
+
+    __hash__ = None  # Mutable container semantics, like ndarray
+
+    def __repr__(self):
+        return f"FractionArray({self.numerators.tolist()}, {self.denominators.tolist()})"
+
+    def __str__(self):
+        return str(np.vectorize(lambda n, d: str(Fraction(n, d)), otypes=[object])(self.numerators, self.denominators))
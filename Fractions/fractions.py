@@ -1,60 +1,211 @@
+import operator
+import sys
+from functools import lru_cache
+from math import gcd, isfinite
+
+HASH_MODULUS = sys.hash_info.modulus
+HASH_INF = sys.hash_info.inf
+
+INTERN_SIZE = 1024  # Distinct values kept by the intern cache
+INTERN_LIMIT = 64  # Only fractions with |numerator| and denominator up to this are interned
+
+
+def _new_fraction(numerator, denominator):
+    frac = object.__new__(Fraction)
+    frac._numerator = numerator
+    frac._denominator = denominator
+    return frac
+
+
+def _from_normalized(numerator, denominator):
+    """Builds a Fraction from an already reduced numerator/denominator pair (denominator > 0), skipping __init__."""
+    return _new_fraction(numerator, denominator)
+
+
+def enable_interning(maxSize=INTERN_SIZE, limit=INTERN_LIMIT):
+    """
+    Makes arithmetic return shared instances for small values (0, 1, 1/2, ...) from an LRU cache of maxSize entries.
+    Safe because Fractions are immutable; costs a range check per result.
+    """
+    global _from_normalized
+
+    cached = lru_cache(maxSize)(_new_fraction)
+
+    def _from_normalized(numerator, denominator):
+        if -limit <= numerator <= limit and denominator <= limit:
+            return cached(numerator, denominator)
+        return _new_fraction(numerator, denominator)
+
+
+def disable_interning():
+    global _from_normalized
+
+    def _from_normalized(numerator, denominator):
+        return _new_fraction(numerator, denominator)
+
+
 class Fraction:
+    """
+    Immutable rational number, always stored reduced with the sign on the numerator.
+    Arithmetic follows Henrici: common factors are cancelled before multiplying so intermediates stay small.
+
+    >>> Fraction(6, -4)
+    Fraction(-3, 2)
+
+    >>> Fraction(0.25), Fraction(Fraction(1, 3), 2)
+    (Fraction(1, 4), Fraction(1, 6))
+
+    >>> import numpy as np
+    >>> Fraction(np.int64(2 ** 40)) * 2 ** 40 == 2 ** 80  # NumPy ints become Python ints, so nothing wraps
+    True
+    """
+
+    __slots__ = ("_numerator", "_denominator")
+
     def __init__(self, n, den=1):
-        if isinstance(n, float):
-            string = str(n)
-            decimalCount = len(string[string.find("."):]) - 1
-            self.numerator = int(n * 10 ** decimalCount)
-            self.denominator = int(10 ** decimalCount)
-            self.reduce(self)
-        else:
-            self.numerator = n
-            self.denominator = den
+        if type(den) is not int:
+            den = operator.index(den)
+
+        if isinstance(n, Fraction):
+            n, den = n._numerator, n._denominator * den
+        elif isinstance(n, float):
+            n, floatDen = n.as_integer_ratio()  # Exact: floats are dyadic rationals
+            den *= floatDen
+        elif type(n) is not int:
+            n = operator.index(n)
+
+        if den == 0:
+            raise ZeroDivisionError(f"Fraction({n}, 0)")
+        if den < 0:
+            n, den = -n, -den
+
+        g = gcd(n, den)
+        if g != 1:
+            n //= g
+            den //= g
+
+        self._numerator = n
+        self._denominator = den
+
+    @classmethod
+    def from_float(cls, x, maxDenominator=None):
+        """
+        Exact value of the float x, or with maxDenominator its best rational approximation
+        with a denominator no larger than that (e.g. 0.1 -> 1/10 instead of 3602879701896397/2**55).
+
+        >>> Fraction.from_float(0.1) == Fraction(3602879701896397, 2 ** 55)
+        True
+
+        >>> Fraction.from_float(0.1, 1000)
+        Fraction(1, 10)
+        """
+        frac = cls(float(x))
+        return frac if maxDenominator is None else frac.limit_denominator(maxDenominator)
+
+    def limit_denominator(self, maxDenominator=1000000):
+        """
+        The closest fraction to self with denominator <= maxDenominator, from the continued fraction convergents.
+
+        >>> Fraction(3.141592653589793).limit_denominator(1000)
+        Fraction(355, 113)
+        """
+        if maxDenominator < 1:
+            raise ValueError("maxDenominator should be at least 1")
+        if self._denominator <= maxDenominator:
+            return self
+
+        p0, q0, p1, q1 = 0, 1, 1, 0
+        n, d = self._numerator, self._denominator
+        while True:
+            a = n // d
+            q2 = q0 + a * q1
+            if q2 > maxDenominator:
+                break
+            p0, q0, p1, q1 = p1, q1, p0 + a * p1, q2
+            n, d = d, n - a * d
+
+        # The best approximation is either the last convergent or the largest semiconvergent below the bound
+        k = (maxDenominator - q0) // q1
+        if 2 * d * (q0 + k * q1) <= self._denominator:
+            return _from_normalized(p1, q1)
+        return _from_normalized(p0 + k * p1, q0 + k * q1)
+
+    @property
+    def numerator(self):
+        return self._numerator
+
+    @property
+    def denominator(self):
+        return self._denominator
 
     @staticmethod
     def gcd(a, b):
-        while b:
-            a, b = b, a % b
-        return a
+        return gcd(a, b)
 
     @staticmethod
     def lcm(a, b):
-        return a * b // Fraction.gcd(a, b)
+        return a * b // gcd(a, b)
 
     @staticmethod
     def reduce(frac: "Fraction"):
-        gcd = Fraction.gcd(frac.numerator, frac.denominator)
-        frac.numerator //= gcd
-        frac.denominator //= gcd
-        return frac
+        return frac  # Fractions are normalized on construction
 
     @property
     def decimal(self):
-        return self.numerator / self.denominator
+        return self._numerator / self._denominator
+
+    def __float__(self):
+        return self._numerator / self._denominator
 
     def __mul__(self, other):
-        otherF = Fraction(other) if not isinstance(other, Fraction) else other
+        """
+        >>> Fraction(2, 3) * Fraction(9, 4), Fraction(2, 3) * 6, 6 * Fraction(2, 3)
+        (Fraction(3, 2), Fraction(4, 1), Fraction(4, 1))
+        """
+        a, b = self._numerator, self._denominator
 
-        frac = Fraction(1)
-        frac.numerator = self.numerator * otherF.numerator
-        frac.denominator = self.denominator * otherF.denominator
+        if isinstance(other, int):
+            g = gcd(other, b)
+            return _from_normalized(a * (other // g), b // g)
+        if isinstance(other, float):
+            other = Fraction(other)
+        elif not isinstance(other, Fraction):
+            return NotImplemented
 
-        return self.reduce(frac)
+        c, d = other._numerator, other._denominator
+        g1, g2 = gcd(a, d), gcd(c, b)
+        return _from_normalized((a // g1) * (c // g2), (b // g2) * (d // g1))
 
     def __rmul__(self, other):
         return self.__mul__(other)
 
     def __truediv__(self, other):
-        otherF = Fraction(other) if not isinstance(other, Fraction) else other
+        """
+        >>> Fraction(1, 4) / Fraction(-1, 2), Fraction(1, 4) / 2, 2 / Fraction(1, 4)
+        (Fraction(-1, 2), Fraction(1, 8), Fraction(8, 1))
 
-        frac = Fraction(1)
-        frac.numerator, frac.denominator = otherF.denominator, otherF.numerator
+        >>> Fraction(1, 4) / 0
+        Traceback (most recent call last):
+        ...
+        ZeroDivisionError: 1/4 / 0
+        """
+        if isinstance(other, int):
+            other = _from_normalized(other, 1)
+        elif isinstance(other, float):
+            other = Fraction(other)
+        elif not isinstance(other, Fraction):
+            return NotImplemented
 
-        return self.__mul__(frac)
+        c, d = other._numerator, other._denominator
+        if c == 0:
+            raise ZeroDivisionError(f"{self} / 0")
+        return self.__mul__(_from_normalized(d, c) if c > 0 else _from_normalized(-d, -c))
 
     def __rtruediv__(self, other):
-        frac = Fraction(1)
-        frac.numerator, frac.denominator = self.denominator, self.numerator
-        return frac * other
+        a, b = self._numerator, self._denominator
+        if a == 0:
+            raise ZeroDivisionError(f"{other} / 0")
+        return (_from_normalized(b, a) if a > 0 else _from_normalized(-b, -a)).__mul__(other)
 
     def __floordiv__(self, other):
         return self.__truediv__(other)
@@ -62,41 +213,128 @@ class Fraction:
     def __rfloordiv__(self, other):
         return self.__rtruediv__(other)
 
-    def __add__(self, other):
-        otherF = Fraction(other) if not isinstance(other, Fraction) else other
+    def _add(self, c, d):
+        """self + c/d for a reduced c/d, cancelling gcd(b, d) first so the denominator never exceeds lcm(b, d)."""
+        a, b = self._numerator, self._denominator
+
+        g = gcd(b, d)
+        if g == 1:
+            return _from_normalized(a * d + b * c, b * d)
 
-        frac = Fraction(1)
-        lcm = Fraction.lcm(self.denominator, otherF.denominator)
-        frac.denominator = lcm
-        frac.numerator = self.numerator * lcm // self.denominator + otherF.numerator * lcm // otherF.denominator
+        s = d // g
+        t = a * s + c * (b // g)
+        g2 = gcd(t, g)
+        if g2 == 1:
+            return _from_normalized(t, b * s)
+        return _from_normalized(t // g2, (b // g2) * s)
+
+    def __add__(self, other):
+        """
+        >>> Fraction(1, 6) + Fraction(1, 3), Fraction(1, 4) + 2, 2 + Fraction(1, 4)
+        (Fraction(1, 2), Fraction(9, 4), Fraction(9, 4))
+        """
+        if isinstance(other, int):
+            return _from_normalized(self._numerator + other * self._denominator, self._denominator)
+        if isinstance(other, float):
+            other = Fraction(other)
+        elif not isinstance(other, Fraction):
+            return NotImplemented
 
-        return self.reduce(frac)
+        return self._add(other._numerator, other._denominator)
 
     def __radd__(self, other):
         return self.__add__(other)
 
     def __sub__(self, other):
-        otherF = Fraction(other) if not isinstance(other, Fraction) else other
+        """
+        >>> Fraction(1, 4) - Fraction(1, 4), Fraction(1, 4) - 3, 3 - Fraction(1, 4)
+        (Fraction(0, 1), Fraction(-11, 4), Fraction(11, 4))
+        """
+        if isinstance(other, int):
+            return _from_normalized(self._numerator - other * self._denominator, self._denominator)
+        if isinstance(other, float):
+            other = Fraction(other)
+        elif not isinstance(other, Fraction):
+            return NotImplemented
 
-        frac = Fraction(1)
-        frac.numerator = otherF.numerator * -1
-        frac.denominator = otherF.denominator
-
-        return self.__add__(frac)
+        return self._add(-other._numerator, other._denominator)
 
     def __rsub__(self, other):
         return self.__neg__().__add__(other)
 
     def __neg__(self):
-        frac = Fraction(1)
-        frac.numerator, frac.denominator = -self.numerator, self.denominator
-        return frac
+        return _from_normalized(-self._numerator, self._denominator)
+
+    def __abs__(self):
+        return self if self._numerator >= 0 else _from_normalized(-self._numerator, self._denominator)
+
+    def _compare(self, other, op):
+        """op(self, other) exactly, by cross multiplication (denominators are positive)."""
+        if isinstance(other, Fraction):
+            return op(self._numerator * other._denominator, other._numerator * self._denominator)
+        if isinstance(other, int):
+            return op(self._numerator, other * self._denominator)
+        if isinstance(other, float):
+            if not isfinite(other):
+                return op(0.0, other)  # Any fraction is finite, so it compares like 0 against inf/nan
+            return self._compare(Fraction(other), op)
+        return NotImplemented
+
+    def __eq__(self, other):
+        """
+        >>> Fraction(2, 4) == Fraction(1, 2), Fraction(4, 2) == 2, Fraction(1, 2) == 0.5, Fraction(1, 3) == 1 / 3
+        (True, True, True, False)
+        """
+        if isinstance(other, Fraction):
+            return self._numerator == other._numerator and self._denominator == other._denominator
+        if isinstance(other, int):
+            return self._denominator == 1 and self._numerator == other
+        return self._compare(other, operator.eq)
+
+    def __lt__(self, other):
+        """
+        >>> sorted([Fraction(1, 3), -1, Fraction(-1, 2), 0.25])
+        [-1, Fraction(-1, 2), 0.25, Fraction(1, 3)]
+        """
+        return self._compare(other, operator.lt)
+
+    def __le__(self, other):
+        return self._compare(other, operator.le)
+
+    def __gt__(self, other):
+        return self._compare(other, operator.gt)
+
+    def __ge__(self, other):
+        return self._compare(other, operator.ge)
+
+    def __hash__(self):
+        """
+        Same scheme as int, float and the standard library, so equal numbers hash equally across types.
+
+        >>> hash(Fraction(3)) == hash(3), hash(Fraction(1, 2)) == hash(0.5), len({Fraction(1, 2), 0.5, Fraction(2, 4)})
+        (True, True, 1)
+        """
+        try:
+            inverse = pow(self._denominator, -1, HASH_MODULUS)
+        except ValueError:  # Denominator divisible by the modulus: the value is "infinite" modulo it
+            result = HASH_INF
+        else:
+            result = hash(hash(abs(self._numerator)) * inverse)
+
+        result = result if self._numerator >= 0 else -result
+        return -2 if result == -1 else result
+
+    def __bool__(self):
+        return self._numerator != 0
+
+    def __repr__(self):
+        return f"Fraction({self._numerator}, {self._denominator})"
 
     def __str__(self):
-        if self.denominator == 1 or self.numerator == 0:
-            return f"{self.numerator}"
+        if self._denominator == 1 or self._numerator == 0:
+            return f"{self._numerator}"
         else:
-            return f"{self.numerator}/{self.denominator}"
+            return f"{self._numerator}/{self._denominator}"
 
 
 """
@@ -117,4 +355,9 @@ print(fraction2 * fraction1)
 
 print(fraction1 / fraction2)
 print(fraction2 / fraction1)
-"""
\ No newline at end of file
+"""
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -1,130 +1,155 @@
-class Fraction:
-    def __init__(self, n):
-        if isinstance(n, float):
-            string = str(n)
-            decimalCount = len(string[string.find("."):]) - 1
-            self.numerator = int(n * 10 ** decimalCount)
-            self.denominator = int(10 ** decimalCount)
-            self.reduce(self)
-        else:
-            self.numerator = n
-            self.denominator = 1
-
-    @staticmethod
-    def gcd(a, b):
-        while b:
-            a, b = b, a % b
-        return a
-
-    @staticmethod
-    def lcm(a, b):
-        return a * b // Fraction.gcd(a, b)
-
-    @staticmethod
-    def reduce(frac: "Fraction"):
-        gcd = Fraction.gcd(frac.numerator, frac.denominator)
-        frac.numerator //= gcd
-        frac.denominator //= gcd
-        return frac
-
-    @property
-    def decimal(self):
-        return self.numerator / self.denominator
-
-    def __mul__(self, other):
-        otherF = Fraction(other) if not isinstance(other, Fraction) else other
-
-        frac = Fraction(1)
-        frac.numerator = self.numerator * otherF.numerator
-        frac.denominator = self.denominator * otherF.denominator
-
-        return self.reduce(frac)
-
-    def __rmul__(self, other):
-        return self.__mul__(other)
-
-    def __truediv__(self, other):
-        otherF = Fraction(other) if not isinstance(other, Fraction) else other
-
-        frac = Fraction(1)
-        frac.numerator, frac.denominator = otherF.denominator, otherF.numerator
-
-        return self.__mul__(frac)
-
-    def __rtruediv__(self, other):
-        frac = Fraction(1)
-        frac.numerator, frac.denominator = self.denominator, self.numerator
-        return frac * other
-
-    def __floordiv__(self, other):
-        return self.__truediv__(other)
-
-    def __rfloordiv__(self, other):
-        return self.__rtruediv__(other)
+from collections import OrderedDict, namedtuple
+from math import gcd, inf, log
 
-    def __add__(self, other):
-        otherF = Fraction(other) if not isinstance(other, Fraction) else other
+import numpy as np
 
-        frac = Fraction(1)
-        frac.denominator = Fraction.lcm(self.denominator, otherF.denominator)
-        frac.numerator = self.numerator * frac.denominator // self.denominator + otherF.numerator * frac.denominator // otherF.denominator
+from Fractions.fractions import Fraction
+from LinearAlgebra.matrix import Matrix
 
-        return self.reduce(frac)
+LU_CACHE_SIZE = 32  # Factorizations kept by lu_factorize, least recently used evicted first
 
-    def __radd__(self, other):
-        return self.__add__(other)
 
-    def __sub__(self, other):
-        otherF = Fraction(other) if not isinstance(other, Fraction) else other
-
-        frac = Fraction(1)
-        frac.numerator = otherF.numerator * -1
-        frac.denominator = otherF.denominator
-
-        return self.__add__(frac)
-
-    def __rsub__(self, other):
-        return self.__neg__().__add__(other)
-
-    def __neg__(self):
-        frac = Fraction(1)
-        frac.numerator, frac.denominator = -self.numerator, frac.denominator
-        return frac
-
-    def __lt__(self, other):
-        otherF = Fraction(other) if not isinstance(other, Fraction) else other
-        return self.decimal < otherF.decimal
-
-    def __gt__(self, other):
-        return not self.__lt__(other)
-
-    def __eq__(self, other):
-        otherF = Fraction(other) if not isinstance(other, Fraction) else other
-        return self.numerator == otherF.numerator and self.denominator == otherF.denominator
-
-    def __le__(self, other):
-        return self.__eq__(other) or self.__lt__(other)
-
-    def __ge__(self, other):
-        return self.__eq__(other) or self.__gt__(other)
-
-    def __str__(self):
-        if self.numerator == 0:
-            return "0"
-        elif self.denominator == 1:
-            return f"{self.numerator}"
-        else:
-            return f"{self.numerator}/{self.denominator}"
-
-
-def fractify(matrix):
+def fractify(matrix, maxDenominator=None):
+    """Converts the entries to Fractions in place. Floats are taken exactly unless maxDenominator asks to round them."""
     for i in range(len(matrix)):
         for j in range(len(matrix[0])):
-            matrix[i][j] = Fraction(matrix[i][j])
+            value = matrix[i][j]
+            if maxDenominator is not None and isinstance(value, float):
+                matrix[i][j] = Fraction.from_float(value, maxDenominator)
+            else:
+                matrix[i][j] = Fraction(value)
+
+
+def laplace_determinant(matrix):
+    """Cofactor expansion along the first column. O(n!), kept as the reference for tiny matrices."""
+    return matrix[0][0] if len(matrix) == 1 else sum([(-1) ** r * matrix[r][0] * laplace_determinant([[matrix[i][j] for j in range(len(matrix)) if j != 0] for i in range(len(matrix)) if i != r]) for r in range(len(matrix))])
+
+
+def bareiss_determinant(matrix):
+    """
+    Exact determinant of an integer matrix by fraction-free (Bareiss) elimination in O(n^3).
+    Every division is exact, so entries never grow past the size of a minor.
+    """
+    rows = [list(row) for row in matrix]
+    n = len(rows)
+    sign, previous = 1, 1
+
+    for k in range(n - 1):
+        if rows[k][k] == 0:
+            swap = next((i for i in range(k + 1, n) if rows[i][k] != 0), None)
+            if swap is None:
+                return 0
+            rows[k], rows[swap] = rows[swap], rows[k]
+            sign = -sign
+
+        pivotRow = rows[k]
+        pivot = pivotRow[k]
+        for i in range(k + 1, n):
+            row = rows[i]
+            factor = row[k]
+            rows[i] = row[:k + 1] + [(x * pivot - factor * y) // previous for x, y in zip(row[k + 1:], pivotRow[k + 1:])]
+        previous = pivot
+
+    return sign * rows[-1][-1] if n else 1
+
+
+def clear_denominators(matrix):
+    """Rows scaled by the lcm of their denominators, as Python ints, and the product of those scales."""
+    rows, scale = [], 1
+    for row in matrix:
+        row = [Fraction(x) for x in row]
+        rowScale = 1
+        for x in row:
+            rowScale = rowScale * x.denominator // gcd(rowScale, x.denominator)
+        rows.append([x.numerator * (rowScale // x.denominator) for x in row])
+        scale *= rowScale
+
+    return rows, scale
+
+
+def rational_determinant(matrix):
+    """Exact determinant of a matrix of Fractions/ints: clear each row's denominators, then run Bareiss."""
+    rows, scale = clear_denominators(matrix)
+    return Fraction(bareiss_determinant(rows), scale)
+
+
+def lu_decompose(matrix):
+    """
+    Packed LU factorization with partial pivoting of a float matrix: returns (lu, permutation, sign)
+    where lu holds U on and above the diagonal and the multipliers of the unit lower L below it.
+    """
+    lu = np.array(matrix, dtype=np.float64)
+    n = len(lu)
+    permutation = np.arange(n)
+    sign = 1.0
+
+    for k in range(n):
+        pivot = k + int(np.argmax(np.abs(lu[k:, k])))
+        if pivot != k:
+            lu[[k, pivot]] = lu[[pivot, k]]
+            permutation[[k, pivot]] = permutation[[pivot, k]]
+            sign = -sign
+        if lu[k, k] == 0:
+            continue  # Singular: the whole column below is zero already
+
+        lu[k + 1:, k] /= lu[k, k]
+        lu[k + 1:, k + 1:] -= np.outer(lu[k + 1:, k], lu[k, k + 1:])
+
+    return lu, permutation, sign
+
+
+def _packed_slogdet(lu, sign):
+    diagonal = np.diagonal(lu)
+    if not np.all(diagonal):
+        return 0.0, -np.inf
+    return float(sign * np.prod(np.sign(diagonal))), float(np.sum(np.log(np.abs(diagonal))))
+
+
+def _packed_determinant(lu, sign):
+    """The product of the pivots, or sign * exp(log|det|) if an intermediate product over- or underflowed."""
+    with np.errstate(over="ignore", under="ignore"):
+        det = sign * np.prod(np.diagonal(lu))
+        if det == 0 or not np.isfinite(det):
+            sign, logDet = _packed_slogdet(lu, sign)
+            det = sign * np.exp(logDet)  # +-inf only when |det| itself is beyond the float range
+    return float(det)
+
+
+def lu_slogdet(matrix):
+    """
+    (sign, log|det|) of a float matrix, like np.linalg.slogdet: the determinant is sign * exp(log|det|),
+    available even when it is far outside the float range. A singular matrix gives (0.0, -inf).
+    """
+    lu, _, sign = lu_decompose(matrix)
+    return _packed_slogdet(lu, sign)
+
+
+def lu_determinant(matrix):
+    lu, _, sign = lu_decompose(matrix)
+    return _packed_determinant(lu, sign)
 
 
 def determinant(matrix):
-    return matrix[0][0] if len(matrix) == 1 else sum([(-1) ** r * matrix[r][0] * determinant([[matrix[i][j] for j in range(len(matrix)) if j != 0] for i in range(len(matrix)) if i != r]) for r in range(len(matrix))])
+    """
+    Determinant of a square matrix: Bareiss for exact (int/Fraction) entries, partial-pivoting LU for floats,
+    and the Laplace reference below 4x4 where it is cheapest.
+    """
+    if isinstance(matrix, Matrix):
+        matrix = matrix.array if matrix.array is not None else matrix.tolist()
+    if isinstance(matrix, np.ndarray):
+        if matrix.dtype.kind == "f":
+            return lu_determinant(matrix)
+        matrix = matrix.tolist()
+
+    if len(matrix) == 0:
+        return 1  # The empty product, as bareiss_determinant and modular_determinant give
+    if len(matrix) <= 3:
+        return laplace_determinant(matrix)
+    if any(isinstance(x, float) for row in matrix for x in row):
+        return lu_determinant(matrix)
+    if all(isinstance(x, int) for row in matrix for x in row):
+        return bareiss_determinant(matrix)
+    return rational_determinant(matrix)
 
 
 """m = [
@@ -135,25 +160,301 @@ def determinant(matrix):
 ]"""
 
 
-# print(laplace(m))
+# print(determinant(m))
+
+def _row_reduce_array(matrix, columns, tolerance):
+    rows, width = matrix.shape
+    threshold = tolerance * float(np.max(np.abs(matrix[:, :columns]), initial=0.0))  # 0 for a zero matrix
+    pivots = []
+
+    for c in range(columns):
+        r = len(pivots)
+        if r == rows:
+            break
+
+        p = r + int(np.argmax(np.abs(matrix[r:, c])))
+        if abs(matrix[p, c]) <= threshold:
+            matrix[r:, c] = 0.0
+            continue
+        if p != r:
+            matrix[[r, p]] = matrix[[p, r]]
+
+        matrix[r, c:] /= matrix[r, c]
+        factors = matrix[:, c].copy()
+        factors[r] = 0.0
+        matrix[:, c:] -= np.outer(factors, matrix[r, c:])
+        pivots.append(c)
+
+    return pivots
+
+
+def _row_reduce_lists(matrix, columns, exact, tolerance):
+    rows, width = len(matrix), len(matrix[0])
+    threshold = tolerance * max([0.0] + [abs(x) for row in matrix for x in row[:columns]]) if not exact else 0
+    pivots = []
+
+    for c in range(columns):
+        r = len(pivots)
+        if r == rows:
+            break
+
+        if exact:  # Any nonzero pivot is exact, take the first
+            p = next((i for i in range(r, rows) if matrix[i][c] != 0), None)
+        else:  # Partial pivoting: the largest magnitude keeps the multipliers <= 1
+            p = max(range(r, rows), key=lambda i: abs(matrix[i][c]))
+            if abs(matrix[p][c]) <= threshold:
+                p = None
+        if p is None:
+            continue
+        matrix[r], matrix[p] = matrix[p], matrix[r]
+
+        pivotRow = matrix[r]
+        inverse = 1 / pivotRow[c]
+        for k in range(c, width):
+            pivotRow[k] *= inverse
+
+        for i in range(rows):
+            row = matrix[i]
+            factor = row[c]
+            if i != r and factor != 0:
+                for k in range(c, width):
+                    row[k] -= factor * pivotRow[k]
+                row[c] *= 0  # Exactly zero, also for floats
+
+        pivots.append(c)
+
+    return pivots
+
+
+def row_reduce(matrix, columns=None, exact=True, tolerance=1e-12):
+    """
+    Gauss-Jordan elimination of matrix (nested lists or a float ndarray) in place, into reduced row echelon form
+    over its first `columns` columns (default: all). Exact entries (Fractions) use the first nonzero pivot, floats
+    use partial pivoting and treat pivots below tolerance * max|entry| as zero. Returns the pivot columns.
+    """
+    if columns is None:
+        columns = len(matrix[0])
+    if isinstance(matrix, np.ndarray):
+        return _row_reduce_array(matrix, columns, tolerance)
+    return _row_reduce_lists(matrix, columns, exact, tolerance)
+
+
+Solution = namedtuple("Solution", ["rank", "solution", "nullspace"])
+
+
+def solve(coefficients, rhs, exact=True, tolerance=1e-12, maxDenominator=None):
+    """
+    Solves coefficients @ x = b for one right-hand side (a flat list) or several (a list of rows, one column
+    per system) with a single elimination of the augmented matrix.
+
+    Returns Solution(rank, solution, nullspace): solution is a particular solution per right-hand side, with the
+    free variables set to 0 (None where that system is inconsistent), and nullspace is a basis of the solutions
+    of the homogeneous system, so every solution is solution + a combination of the nullspace vectors.
+    Float mode treats values below tolerance * max|entry of [A | b]| as zero; it is scale invariant.
+    In exact mode floats are taken at their exact binary value, or rounded to maxDenominator when it is given.
+    """
+    single = not isinstance(rhs[0], (list, tuple, np.ndarray))
+    rhsRows = [[b] for b in rhs] if single else [list(row) for row in rhs]
+    rows, columns, systems = len(coefficients), len(coefficients[0]), len(rhsRows[0])
+
+    if exact:
+        augmented = [list(row) + rhsRow for row, rhsRow in zip(coefficients, rhsRows)]
+        fractify(augmented, maxDenominator)
+        zero, one = Fraction(0), Fraction(1)
+    else:
+        augmented = np.hstack((np.array(coefficients, dtype=np.float64), np.array(rhsRows, dtype=np.float64)))
+        zero, one = 0.0, 1.0
+    threshold = 0 if exact else tolerance * float(np.max(np.abs(augmented), initial=0.0))  # Relative to A and b
+
+    pivots = row_reduce(augmented, columns, exact, tolerance)
+    rank = len(pivots)
+
+    solutions = []
+    for j in range(columns, columns + systems):
+        if any(abs(augmented[i][j]) > threshold for i in range(rank, rows)):
+            solutions.append(None)
+            continue
+
+        x = [zero] * columns
+        for i, c in enumerate(pivots):
+            x[c] = augmented[i][j] if exact else float(augmented[i][j])
+        solutions.append(x)
+
+    nullspace = []
+    for free in sorted(set(range(columns)) - set(pivots)):
+        v = [zero] * columns
+        v[free] = one
+        for i, c in enumerate(pivots):
+            v[c] = -augmented[i][free] if exact else -float(augmented[i][free])
+        nullspace.append(v)
+
+    return Solution(rank, solutions[0] if single else solutions, nullspace)
+
+
+def gauss_eliminate(matrix, maxDenominator=None):
+    """
+    Reduces an augmented matrix [A | b] in place (as Fractions) to reduced row echelon form and returns it.
+    A Matrix is reduced into a new exact Matrix instead, since a float or int buffer can't hold the Fractions.
+    Floats are converted exactly unless maxDenominator is given, as in solve().
+    """
+    if isinstance(matrix, Matrix):
+        return Matrix(gauss_eliminate(matrix.tolist(), maxDenominator))
+
+    fractify(matrix, maxDenominator)
+    row_reduce(matrix, len(matrix[0]) - 1)
+    return matrix
 
-def gauss_eliminate(matrix):
-    fractify(matrix)
 
-    for i in range(len(matrix)):
-        currentRow = matrix[i]
-        factor = 1 / currentRow[i]
-        if factor != 1:
-            matrix[i] = [n * factor for n in currentRow]
+class LUFactorization:
+    """
+    PA = LU of a square matrix, computed once so that every further right-hand side costs O(n^2).
+    Exact mode (the default unless the matrix holds floats) works on Fractions with the first nonzero pivot,
+    float mode on an ndarray via lu_decompose with partial pivoting. Either way the factors are packed into one
+    matrix: U on and above the diagonal, the multipliers of the unit lower L below it.
+    """
 
-        for j in range(len(matrix)):
-            if i != j:
-                factor = matrix[j][i]
+    def __init__(self, matrix, exact=None):
+        self.exact = _is_exact(matrix) if exact is None else exact
+        if self.exact:
+            self.lu, self.permutation, self.sign = self._decompose_exact(matrix)
+        else:
+            self.lu, self.permutation, self.sign = lu_decompose(matrix)
+        self.n = len(self.lu)
 
-                for k in range(len(matrix) + 1):
-                    matrix[j][k] -= matrix[i][k] * factor
+    @staticmethod
+    def _decompose_exact(matrix):
+        lu = [list(row) for row in matrix]
+        fractify(lu)
+        n = len(lu)
+        permutation = list(range(n))
+        sign = 1
+
+        for k in range(n):
+            pivot = next((i for i in range(k, n) if lu[i][k] != 0), None)
+            if pivot is None:
+                continue  # Singular, and the column below is zero already: multipliers 0
+            if pivot != k:
+                lu[k], lu[pivot] = lu[pivot], lu[k]
+                permutation[k], permutation[pivot] = permutation[pivot], permutation[k]
+                sign = -sign
+
+            pivotRow = lu[k]
+            inverse = 1 / pivotRow[k]
+            for i in range(k + 1, n):
+                row = lu[i]
+                if row[k] != 0:
+                    factor = row[k] = row[k] * inverse
+                    for j in range(k + 1, n):
+                        row[j] -= factor * pivotRow[j]
+
+        return lu, permutation, sign
 
-    return matrix
+    @property
+    def singular(self):
+        return any(self.lu[i][i] == 0 for i in range(self.n))
+
+    def det(self):
+        if self.exact:
+            result = Fraction(self.sign)
+            for i in range(self.n):
+                result *= self.lu[i][i]
+            return result
+        return _packed_determinant(self.lu, self.sign)
+
+    def slogdet(self):
+        """(sign, log|det|) as lu_slogdet(); exact factorizations take the log of the exact determinant."""
+        if self.exact:
+            det = self.det()
+            return (float((det > 0) - (det < 0)), log(abs(det.numerator)) - log(det.denominator)) if det != 0 else (0.0, -inf)
+        return _packed_slogdet(self.lu, self.sign)
+
+    def solve(self, b):
+        """
+        x with A @ x = b for one right-hand side (a flat sequence) or several (an n x k matrix, one column each).
+        Lists come back as lists (of Fractions in exact mode), ndarrays as ndarrays. Raises ValueError if A is singular.
+        """
+        if self.singular:
+            raise ValueError("Singular matrix, use solve() for rank-deficient systems")
+
+        if self.exact:
+            single = not isinstance(b[0], (list, tuple, np.ndarray))
+            rows = [[x] for x in b] if single else [list(row) for row in b]
+            x = self._solve_exact([rows[p] for p in self.permutation])
+            return [row[0] for row in x] if single else x
+
+        x = self._solve_float(np.asarray(b, dtype=np.float64)[self.permutation])
+        return x if isinstance(b, np.ndarray) else x.tolist()
+
+    def _solve_exact(self, y):
+        lu, n = self.lu, self.n
+        fractify(y)
+
+        for i in range(n):  # Forward substitution with the unit lower L
+            row = lu[i]
+            for j in range(i):
+                if row[j] != 0:
+                    y[i] = [a - row[j] * c for a, c in zip(y[i], y[j])]
+
+        for i in reversed(range(n)):  # Back substitution with U
+            row = lu[i]
+            for j in range(i + 1, n):
+                if row[j] != 0:
+                    y[i] = [a - row[j] * c for a, c in zip(y[i], y[j])]
+            inverse = 1 / row[i]
+            y[i] = [a * inverse for a in y[i]]
+
+        return y
+
+    def _solve_float(self, y):
+        lu, n = self.lu, self.n
+        for i in range(n):
+            y[i] -= lu[i, :i] @ y[:i]
+        for i in reversed(range(n)):
+            y[i] = (y[i] - lu[i, i + 1:] @ y[i + 1:]) / lu[i, i]
+        return y
+
+    def inverse(self):
+        if self.exact:
+            return self.solve([[Fraction(int(i == j)) for j in range(self.n)] for i in range(self.n)])
+        return self.solve(np.eye(self.n))
+
+
+def _is_exact(matrix):
+    if isinstance(matrix, np.ndarray):
+        return matrix.dtype.kind not in "fc"
+    return not any(isinstance(x, float) for row in matrix for x in row)
+
+
+_luCache = OrderedDict()
+
+
+def lu_factorize(matrix, exact=None, cache=True):
+    """
+    LUFactorization of matrix, reused from an LRU cache of LU_CACHE_SIZE entries keyed by the matrix contents,
+    so solving repeatedly against the same coefficients factors them only once. cache=False always refactors.
+    """
+    if not cache:
+        return LUFactorization(matrix, exact)
+
+    exact = _is_exact(matrix) if exact is None else exact
+    if isinstance(matrix, np.ndarray):
+        key = (exact, matrix.dtype.str, matrix.shape, matrix.tobytes())
+    else:
+        key = (exact, tuple(tuple(row) for row in matrix))
+
+    factorization = _luCache.get(key)
+    if factorization is None:
+        factorization = _luCache[key] = LUFactorization(matrix, exact)
+        if len(_luCache) > LU_CACHE_SIZE:
+            _luCache.popitem(last=False)
+    else:
+        _luCache.move_to_end(key)
+
+    return factorization
+
+
+def clear_lu_cache():
+    _luCache.clear()
 
 
 m = [
@@ -164,5 +465,6 @@ m = [
 
 # [print(f"{' '.join(str(col) for col in row)}") for row in gauss_eliminate(m)]
 
-n1, n2 = Fraction(5), Fraction(5)
-print(2 - (n2/2))
+if __name__ == '__main__':
+    n1, n2 = Fraction(5), Fraction(5)
+    print(2 - (n2/2))
@@ -0,0 +1,248 @@
+from operator import add, mul, sub
+
+import numpy as np
+
+from Fractions.fractions import Fraction
+
+INT64_SAFE = 2 ** 62  # Integer products summed below this can't overflow int64
+BLOCK_SIZE = 64  # Side of the tiles of the blocked exact multiplication
+STRASSEN_CUTOFF = 64  # Exact products of square matrices at least this large recurse with Strassen
+
+
+class Matrix:
+    """
+    Two-dimensional matrix on one contiguous buffer: an ndarray for floats and machine-size ints, or a flat list
+    (row-major, with strides) for exact values, i.e. Fractions and ints too large for int64.
+    Transposes are views sharing the buffer.
+
+    >>> m = Matrix([[1, 2], [3, 4]])
+    >>> (m @ m.T).tolist()
+    [[5, 11], [11, 25]]
+
+    >>> (Matrix([[Fraction(1, 2), 0], [0, 2]]) @ m).tolist()
+    [[Fraction(1, 2), Fraction(1, 1)], [Fraction(6, 1), Fraction(8, 1)]]
+
+    >>> (Matrix([[2 ** 62]]) + Matrix([[2 ** 62]])).tolist(), Matrix(np.array([[2 ** 64 - 1]], dtype=np.uint64)).tolist()
+    ([[9223372036854775808]], [[18446744073709551615]])
+    """
+
+    __slots__ = ("array", "data", "shape", "offset", "strides")
+
+    def __init__(self, values):
+        if isinstance(values, Matrix):
+            values = values.array.copy() if values.array is not None else values.tolist()
+
+        if isinstance(values, np.ndarray) and values.dtype != object:
+            if values.dtype.kind != "u" or _magnitude(values) < 2 ** 63:
+                self._set_array(values.astype(np.float64 if values.dtype.kind in "fc" else np.int64, copy=False))
+                return
+            values = values.tolist()  # uint64 past int64, stored exactly
+
+        rows = [list(row) for row in values]
+        shape = (len(rows), len(rows[0]) if rows else 0)
+        flat = [x for row in rows for x in row]
+
+        if any(isinstance(x, float) for x in flat) and not any(isinstance(x, Fraction) for x in flat):
+            self._set_array(np.array(rows, dtype=np.float64).reshape(shape))
+        elif all(isinstance(x, (int, np.integer)) and abs(x) < 2 ** 63 for x in flat):
+            self._set_array(np.array(rows, dtype=np.int64).reshape(shape))
+        elif any(isinstance(x, Fraction) for x in flat):
+            self._set_flat([Fraction(x) for x in flat], shape, 0, (shape[1], 1))
+        else:
+            self._set_flat([int(x) for x in flat], shape, 0, (shape[1], 1))
+
+    def _set_array(self, array):
+        self.array, self.data = array, None
+        self.shape, self.offset, self.strides = array.shape, 0, None
+
+    def _set_flat(self, data, shape, offset, strides):
+        self.array, self.data = None, data
+        self.shape, self.offset, self.strides = tuple(shape), offset, strides
+
+    @classmethod
+    def _flat(cls, data, shape, offset=0, strides=None):
+        matrix = object.__new__(cls)
+        matrix._set_flat(data, shape, offset, strides or (shape[1], 1))
+        return matrix
+
+    @classmethod
+    def _numeric(cls, array):
+        matrix = object.__new__(cls)
+        matrix._set_array(array)
+        return matrix
+
+    @classmethod
+    def identity(cls, n, exact=False):
+        if exact:
+            return cls._flat([Fraction(int(i == j)) for i in range(n) for j in range(n)], (n, n))
+        return cls._numeric(np.eye(n, dtype=np.int64))
+
+    @property
+    def exact(self):
+        return self.array is None
+
+    @property
+    def T(self):
+        """The transpose, sharing this matrix's buffer."""
+        if self.array is not None:
+            return Matrix._numeric(self.array.T)
+        return Matrix._flat(self.data, self.shape[::-1], self.offset, self.strides[::-1])
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, index):
+        i, j = index
+        if self.array is not None:
+            return self.array[i, j].item()
+        return self.data[self.offset + i * self.strides[0] + j * self.strides[1]]
+
+    def __setitem__(self, index, value):
+        i, j = index
+        if self.array is not None:
+            self.array[i, j] = value
+        else:
+            self.data[self.offset + i * self.strides[0] + j * self.strides[1]] = value
+
+    def row(self, i):
+        if self.array is not None:
+            return self.array[i].tolist()
+        start = self.offset + i * self.strides[0]
+        return self.data[start:start + self.shape[1] * self.strides[1]:self.strides[1]]
+
+    def tolist(self):
+        if self.array is not None:
+            return self.array.tolist()
+        return [self.row(i) for i in range(self.shape[0])]
+
+    def _exact_rows(self):
+        return [self.row(i) for i in range(self.shape[0])] if self.array is None else \
+            [[int(x) for x in row] for row in self.array.tolist()] if self.array.dtype.kind == "i" else \
+            [[Fraction(x) for x in row] for row in self.array.tolist()]
+
+    def _elementwise(self, other, op):
+        if not isinstance(other, Matrix):
+            return NotImplemented
+        if self.shape != other.shape:
+            raise ValueError(f"Shapes {self.shape} and {other.shape} differ")
+        if self.array is not None and other.array is not None:
+            if self.array.dtype.kind == "f" or other.array.dtype.kind == "f" or \
+                    _magnitude(self.array) + _magnitude(other.array) < INT64_SAFE:
+                return Matrix._numeric(op(self.array, other.array))
+
+        rows = [list(map(op, a, b)) for a, b in zip(self._exact_rows(), other._exact_rows())]
+        return Matrix._flat([x for row in rows for x in row], self.shape)
+
+    def __add__(self, other):
+        return self._elementwise(other, add)
+
+    def __sub__(self, other):
+        return self._elementwise(other, sub)
+
+    def __matmul__(self, other):
+        """
+        Floats and ints that can't overflow use NumPy's (BLAS, cache-blocked) matmul. Exact matrices are
+        multiplied tile by tile, and large square ones with Strassen's seven-product recursion.
+        """
+        if not isinstance(other, Matrix):
+            return NotImplemented
+        if self.shape[1] != other.shape[0]:
+            raise ValueError(f"Can't multiply {self.shape} by {other.shape}")
+
+        if self.array is not None and other.array is not None:
+            a, b = self.array, other.array
+            if a.dtype.kind == "f" or b.dtype.kind == "f" or \
+                    a.shape[1] * _magnitude(a) * _magnitude(b) < INT64_SAFE:
+                return Matrix._numeric(a @ b)
+
+        a, b = self._exact_rows(), other._exact_rows()
+        n, m, p = self.shape[0], self.shape[1], other.shape[1]
+        if n == m == p >= STRASSEN_CUTOFF:
+            product = _strassen(a, b)
+        else:
+            product = _multiply_blocked(a, b)
+
+        return Matrix._flat([x for row in product for x in row], (n, p))
+
+    def __eq__(self, other):
+        if not isinstance(other, Matrix):
+            return NotImplemented
+        return self.shape == other.shape and self.tolist() == other.tolist()
+
+    __hash__ = None  # Mutable
+
+    def __repr__(self):
+        return f"Matrix({self.tolist()})"
+
+    def __str__(self):
+        return "\n".join(" ".join(str(x) for x in row) for row in self.tolist())
+
+
+def _magnitude(array):
+    """max|x| of an integer array as a Python int; np.abs would wrap -2**63, and a sum of maxima could overflow."""
+    return max(-int(np.min(array, initial=0)), int(np.max(array, initial=0)))
+
+
+def _multiply_blocked(a, b):
+    """a @ b for row lists, accumulating BLOCK_SIZE x BLOCK_SIZE tiles so each tile of b is reused while it is hot."""
+    n, m, p = len(a), len(b), len(b[0]) if b else 0
+    result = [[0] * p for _ in range(n)]
+
+    for k0 in range(0, m, BLOCK_SIZE):
+        k1 = min(k0 + BLOCK_SIZE, m)
+        for j0 in range(0, p, BLOCK_SIZE):
+            j1 = min(j0 + BLOCK_SIZE, p)
+            columns = [[b[k][j] for k in range(k0, k1)] for j in range(j0, j1)]  # The tile of b, transposed
+
+            for i in range(n):
+                row, out = a[i][k0:k1], result[i]
+                for j, column in zip(range(j0, j1), columns):
+                    out[j] += sum(map(mul, row, column))
+
+    return result
+
+
+def _add_rows(a, b):
+    return [list(map(add, x, y)) for x, y in zip(a, b)]
+
+
+def _sub_rows(a, b):
+    return [list(map(sub, x, y)) for x, y in zip(a, b)]
+
+
+def _strassen(a, b):
+    """a @ b for square row lists: seven half-size products instead of eight, padding odd sizes with a zero row/column."""
+    n = len(a)
+    if n < STRASSEN_CUTOFF:
+        return _multiply_blocked(a, b)
+
+    if n % 2:
+        a = [row + [0] for row in a] + [[0] * (n + 1)]
+        b = [row + [0] for row in b] + [[0] * (n + 1)]
+        return [row[:n] for row in _strassen(a, b)[:n]]
+
+    h = n // 2
+    a11, a12 = [row[:h] for row in a[:h]], [row[h:] for row in a[:h]]
+    a21, a22 = [row[:h] for row in a[h:]], [row[h:] for row in a[h:]]
+    b11, b12 = [row[:h] for row in b[:h]], [row[h:] for row in b[:h]]
+    b21, b22 = [row[:h] for row in b[h:]], [row[h:] for row in b[h:]]
+
+    m1 = _strassen(_add_rows(a11, a22), _add_rows(b11, b22))
+    m2 = _strassen(_add_rows(a21, a22), b11)
+    m3 = _strassen(a11, _sub_rows(b12, b22))
+    m4 = _strassen(a22, _sub_rows(b21, b11))
+    m5 = _strassen(_add_rows(a11, a12), b22)
+    m6 = _strassen(_sub_rows(a21, a11), _add_rows(b11, b12))
+    m7 = _strassen(_sub_rows(a12, a22), _add_rows(b21, b22))
+
+    c11 = _add_rows(_sub_rows(_add_rows(m1, m4), m5), m7)
+    c12 = _add_rows(m3, m5)
+    c21 = _add_rows(m2, m4)
+    c22 = _add_rows(_add_rows(_sub_rows(m1, m2), m3), m6)
+
+    return [x + y for x, y in zip(c11, c12)] + [x + y for x, y in zip(c21, c22)]
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,203 @@
+import importlib.util
+import os
+import sys
+from math import isqrt, prod
+
+import numpy as np
+
+from Fractions.fractions import Fraction
+from LinearAlgebra.main import Solution, clear_denominators, solve
+
+PRIME_MODULE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Prime Numbers", "prime.py")
+
+
+def _import_prime():
+    """The prime module: the one already imported, else loaded from its file ("Prime Numbers" isn't a package)."""
+    if "prime" not in sys.modules:
+        spec = importlib.util.spec_from_file_location("prime", PRIME_MODULE_PATH)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["prime"] = module  # Shared with later `import prime`, so its caches exist once
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules["prime"]
+            raise
+    return sys.modules["prime"]
+
+
+PrimeStream = _import_prime().PrimeStream
+
+MODULUS_RANGE = (2 ** 25, 2 ** 26)  # Products of residues stay below 2**52, so int64 can hold 2**11 of them
+LAZY_STEPS = 2 ** 10  # Elimination steps between full reductions of the trailing block
+PRIME_BATCH = 16  # Modular images eliminated together as one (batch, n, m) array
+
+_moduli = []
+_moduliStream = PrimeStream(*MODULUS_RANGE)
+
+
+def moduli(count):
+    """The first count primes of MODULUS_RANGE, sieved once and kept."""
+    while len(_moduli) < count:
+        _moduli.append(next(_moduliStream))
+    return _moduli[:count]
+
+
+def _hadamard_bound(rows):
+    """Bound on |det| of any square matrix made of one entry subset per row: prod of the row norms (rounded up)."""
+    return prod(isqrt(sum(x * x for x in row)) + 1 for row in rows)
+
+
+def _residues(rows, primes):
+    """rows modulo every prime as an int64 array of shape (len(primes), n, m)."""
+    p = np.array(primes, dtype=np.int64)[:, None, None]
+    if all(abs(x) < 2 ** 63 for row in rows for x in row):
+        return np.array(rows, dtype=np.int64)[None] % p
+    return np.array([[[x % q for x in row] for row in rows] for q in primes], dtype=np.int64)
+
+
+def _eliminate(images, primes, columns):
+    """
+    Forward elimination of every modular image at once over their first `columns` columns, in place, leaving unit
+    upper triangular rows. The trailing block is reduced lazily (every LAZY_STEPS steps); only the pivot column and
+    row are reduced when they are needed. Returns the determinants of the leading blocks modulo each prime.
+    """
+    batch, n = images.shape[:2]
+    p = np.array(primes, dtype=np.int64)
+    batchIndex = np.arange(batch)
+    det = np.ones(batch, dtype=np.int64)
+
+    for k in range(columns):
+        if k % LAZY_STEPS == 0:
+            images[:, k:, k:] %= p[:, None, None]
+        else:
+            images[:, k:, k] %= p[:, None]
+
+        nonzero = images[:, k:, k] != 0
+        pivot = k + np.argmax(nonzero, axis=1)
+        found = nonzero[batchIndex, pivot - k]
+
+        swap = pivot != k
+        if swap.any():
+            rows = images[swap, k].copy()
+            images[swap, k] = images[swap, pivot[swap]]
+            images[swap, pivot[swap]] = rows
+            det[swap] = (p[swap] - det[swap]) % p[swap]
+
+        pivots = images[:, k, k].copy()
+        det = det * pivots % p
+        inverses = np.array([pow(int(a), -1, int(q)) if ok else 0 for a, q, ok in zip(pivots, p, found)], dtype=np.int64)
+
+        images[:, k, k:] = images[:, k, k:] % p[:, None] * inverses[:, None] % p[:, None]  # Unit pivot
+        factors = images[:, k + 1:, k, None]
+        images[:, k + 1:, k:] -= factors * images[:, k, None, k:]
+
+    return det
+
+
+def _back_substitute(images, primes):
+    """x of the unit upper triangular systems left by _eliminate, for every right-hand side column, in place."""
+    n = images.shape[1]
+    p = np.array(primes, dtype=np.int64)[:, None]
+    x = images[:, :, n:]
+
+    for i in reversed(range(1, n)):
+        x[:, :i] = (x[:, :i] - images[:, :i, i, None] * x[:, i, None]) % p[:, None]
+
+    return x
+
+
+def _crt(residues, primes, combined, modulus):
+    """
+    Extends each value of combined (known modulo modulus) by its residues modulo primes, a (len(primes), count)
+    array. The batch is first combined on its own, so each value needs one big-number step per batch, not per prime.
+    """
+    batchModulus = prod(primes)
+    coefficients = [(batchModulus // q) * pow(batchModulus // q, -1, q) for q in primes]
+    inverse = pow(modulus, -1, batchModulus)
+
+    for j in range(len(combined)):
+        value = sum(c * int(r) for c, r in zip(coefficients, residues[:, j])) % batchModulus
+        combined[j] += modulus * ((value - combined[j]) * inverse % batchModulus)
+
+    return combined, modulus * batchModulus
+
+
+def _symmetric(value, modulus):
+    return value - modulus if value > modulus // 2 else value
+
+
+def _rational_reconstruction(value, modulus, bound):
+    """The fraction n/d with |n|, d <= bound and n = value * d (mod modulus), by the half extended Euclid."""
+    r0, r1, t0, t1 = modulus, value % modulus, 0, 1
+    while r1 > bound:
+        q = r0 // r1
+        r0, r1, t0, t1 = r1, r0 - q * r1, t1, t0 - q * t1
+    if t1 == 0 or abs(t1) > bound:
+        raise ArithmeticError("Rational reconstruction failed, the bound is too small")
+    return Fraction(r1, t1)
+
+
+def modular_determinant(matrix):
+    """
+    Exact determinant of an integer or rational matrix from its images modulo word-size primes, eliminated with
+    NumPy int64 arithmetic PRIME_BATCH primes at a time and combined by the CRT until the product of the primes
+    exceeds twice the Hadamard bound. Equal to rational_determinant, without its big-number intermediates.
+    """
+    rows, scale = clear_denominators(matrix)
+    n = len(rows)
+    if n == 0:
+        return Fraction(1)
+
+    bound = 2 * _hadamard_bound(rows)
+    combined, modulus, used = [0], 1, 0
+    while modulus <= bound:
+        primes = moduli(used + PRIME_BATCH)[used:]
+        used += PRIME_BATCH
+
+        det = _eliminate(_residues(rows, primes), primes, n)
+        combined, modulus = _crt(det[:, None], primes, combined, modulus)
+
+    return Fraction(_symmetric(combined[0], modulus), scale)
+
+
+def modular_solve(coefficients, rhs):
+    """
+    Exact solution of a square system coefficients @ x = b (one flat right-hand side or several as columns),
+    solved modulo word-size primes and lifted back by the CRT and rational reconstruction. By Cramer's rule every
+    numerator and denominator is a determinant bounded by the Hadamard bound H of [A | b], so the primes are taken
+    until their product exceeds 2 * H^2. Primes dividing det(A) are skipped. Singular systems fall back to the
+    Fraction path of solve(). Returns the same Solution(rank, solution, nullspace) as solve().
+    """
+    single = not isinstance(rhs[0], (list, tuple, np.ndarray))
+    rhsRows = [[b] for b in rhs] if single else [list(row) for row in rhs]
+    n, systems = len(coefficients), len(rhsRows[0])
+
+    if n != len(coefficients[0]):
+        return solve(coefficients, rhs)
+
+    rows, _ = clear_denominators([list(row) + rhsRow for row, rhsRow in zip(coefficients, rhsRows)])  # Row scaling keeps x
+    bound = _hadamard_bound(rows)
+    detBound = 2 * _hadamard_bound([row[:n] for row in rows])
+
+    combined, modulus = [0] * (n * systems), 1
+    detModulus, used = 1, 0
+    while modulus <= 2 * bound * bound:
+        primes = moduli(used + PRIME_BATCH)[used:]
+        used += PRIME_BATCH
+
+        images = _residues(rows, primes)
+        det = _eliminate(images, primes, n)
+        x = _back_substitute(images, primes)
+
+        lucky = [i for i in range(len(primes)) if det[i] != 0]
+        if len(lucky) < len(primes):
+            detModulus *= prod(primes[i] for i in range(len(primes)) if det[i] == 0)
+            if detModulus > detBound:
+                return solve(coefficients, rhs)  # det(A) is divisible by more than its bound allows, so it is 0
+
+        if lucky:
+            combined, modulus = _crt(x[lucky].reshape(len(lucky), -1), [primes[i] for i in lucky], combined, modulus)
+
+    values = [_rational_reconstruction(value, modulus, bound) for value in combined]
+    solution = [[values[i * systems + k] for i in range(n)] for k in range(systems)]
+    return Solution(n, solution[0] if single else solution, [])
@@ -0,0 +1,205 @@
+import heapq
+
+import numpy as np
+
+from Fractions.fractions import Fraction
+from LinearAlgebra.main import Solution
+
+PIVOT_THRESHOLD = 0.1  # Float pivots must be at least this fraction of their column's largest entry
+
+
+class SparseMatrix:
+    """
+    Dict-of-keys matrix: one {column: value} dict per row holding only the nonzero entries,
+    so memory is proportional to the number of nonzeros. Converts to and from dense lists and CSR arrays.
+    """
+
+    __slots__ = ("shape", "rows")
+
+    def __init__(self, shape, entries=()):
+        """entries is a {(i, j): value} mapping or an iterable of (i, j, value) triplets; zeros are dropped."""
+        self.shape = tuple(shape)
+        self.rows = [{} for _ in range(self.shape[0])]
+
+        if isinstance(entries, dict):
+            entries = ((i, j, value) for (i, j), value in entries.items())
+        for i, j, value in entries:
+            self[i, j] = value
+
+    @classmethod
+    def from_dense(cls, matrix):
+        matrix = [list(row) for row in matrix]
+        return cls((len(matrix), len(matrix[0]) if matrix else 0),
+                   ((i, j, x) for i, row in enumerate(matrix) for j, x in enumerate(row) if x != 0))
+
+    @classmethod
+    def from_csr(cls, shape, indptr, indices, data):
+        sparse = cls(shape)
+        for i in range(shape[0]):
+            sparse.rows[i] = {int(j): x for j, x in zip(indices[indptr[i]:indptr[i + 1]], data[indptr[i]:indptr[i + 1]]) if x != 0}
+        return sparse
+
+    def to_dense(self, zero=0):
+        return [[row.get(j, zero) for j in range(self.shape[1])] for row in self.rows]
+
+    def to_csr(self):
+        """(indptr, indices, data) with sorted column indices per row; data is an object array unless all values are floats."""
+        indptr = np.cumsum([0] + [len(row) for row in self.rows])
+        indices = np.fromiter((j for row in self.rows for j in sorted(row)), dtype=np.int64, count=indptr[-1])
+        values = [row[j] for row in self.rows for j in sorted(row)]
+        data = np.array(values, dtype=np.float64 if all(isinstance(x, float) for x in values) else object)
+        return indptr, indices, data
+
+    @property
+    def nnz(self):
+        return sum(len(row) for row in self.rows)
+
+    def __getitem__(self, index):
+        i, j = index
+        return self.rows[i].get(j, 0)
+
+    def __setitem__(self, index, value):
+        i, j = index
+        if value != 0:
+            self.rows[i][j] = value
+        else:
+            self.rows[i].pop(j, None)
+
+    def __matmul__(self, vector):
+        return [sum(x * vector[j] for j, x in row.items()) for row in self.rows]
+
+    def solve(self, rhs, exact=True, tolerance=1e-12):
+        return sparse_solve(self, rhs, exact, tolerance)
+
+    def __repr__(self):
+        return f"SparseMatrix({self.shape}, nnz={self.nnz})"
+
+
+def sparse_solve(matrix, rhs, exact=True, tolerance=1e-12):
+    """
+    Solves matrix @ x = b like solve() does for dense matrices, returning Solution(rank, solution, nullspace),
+    but eliminates on the nonzeros only. Pivots follow a Markowitz ordering to limit fill-in: the sparsest column
+    (minimum degree) first, and within it the shortest row, which minimizes (row count - 1) * (column count - 1).
+    Floats additionally require |pivot| >= PIVOT_THRESHOLD * the column's largest entry for stability, and values
+    below tolerance * max|entry| count as zero, as in solve().
+
+    >>> sparse_solve([[1e-12]], [1.0]).solution == [1 / Fraction(1e-12)]
+    True
+
+    >>> sparse_solve([[1e-13, 0], [0, 1e-13]], [1e-13, 1e-13], exact=False)  # Thresholds are relative to the entries
+    Solution(rank=2, solution=[1.0, 1.0], nullspace=[])
+
+    >>> matrix = SparseMatrix((2, 2), {(1, 0): 1, (1, 1): 1})
+    >>> matrix.rows[0][0] = 0  # Stored zeros are never chosen as pivots
+    >>> sparse_solve(matrix, [0, 2])
+    Solution(rank=1, solution=[Fraction(2, 1), Fraction(0, 1)], nullspace=[[Fraction(-1, 1), Fraction(1, 1)]])
+    """
+    if not isinstance(matrix, SparseMatrix):
+        matrix = SparseMatrix.from_dense(matrix)
+
+    single = not isinstance(rhs[0], (list, tuple, np.ndarray))
+    rhsRows = [[b] for b in rhs] if single else [list(row) for row in rhs]
+    (rowCount, columnCount), systems = matrix.shape, len(rhsRows[0])
+
+    convert = Fraction if exact else float
+    zero = Fraction(0) if exact else 0.0
+    rows = [{j: v for j, v in ((j, convert(x)) for j, x in row.items()) if v != 0} for row in matrix.rows]
+    rhsRows = [[convert(b) for b in row] for row in rhsRows]
+
+    scale = max([0.0] + [abs(x) for row in rows for x in row.values()]) if not exact else 0  # 0 for a zero matrix
+    threshold = tolerance * scale
+    rhsThreshold = tolerance * max([scale] + [abs(b) for row in rhsRows for b in row]) if not exact else 0
+
+    columnRows = [set() for _ in range(columnCount)]  # Active rows with a nonzero in each column
+    for i, row in enumerate(rows):
+        for j in row:
+            columnRows[j].add(i)
+
+    heap = [(len(columnRows[j]), j) for j in range(columnCount)]
+    heapq.heapify(heap)
+    done = [False] * columnCount
+    pivots = []  # (row, column) in elimination order
+
+    while heap:
+        count, c = heapq.heappop(heap)
+        if done[c] or count != len(columnRows[c]):
+            continue  # Stale entry, the column's count changed since it was pushed
+        done[c] = True
+        if count == 0:
+            continue  # Free variable
+
+        candidates = columnRows[c]
+        if exact:
+            r = min(candidates, key=lambda i: len(rows[i]))
+        else:
+            largest = max(abs(rows[i][c]) for i in candidates)
+            if largest <= threshold:  # Numerically zero column
+                for i in candidates:
+                    del rows[i][c]
+                candidates.clear()
+                continue
+            r = min((i for i in candidates if abs(rows[i][c]) >= PIVOT_THRESHOLD * largest), key=lambda i: len(rows[i]))
+
+        pivotRow, pivotRhs = rows[r], rhsRows[r]
+        for j in pivotRow:
+            columnRows[j].discard(r)  # The pivot row leaves the active submatrix
+        inverse = 1 / pivotRow[c]
+
+        touched = set(pivotRow)
+        for i in list(candidates):
+            row = rows[i]
+            factor = row.pop(c) * inverse
+            candidates.discard(i)
+
+            for j, x in pivotRow.items():
+                if j == c:
+                    continue
+                value = row.get(j, zero) - factor * x
+                if value == 0 or (not exact and abs(value) <= threshold):
+                    if row.pop(j, None) is not None:
+                        columnRows[j].discard(i)
+                else:
+                    if j not in row:
+                        columnRows[j].add(i)  # Fill-in
+                    row[j] = value
+
+            rhsRows[i] = [b - factor * p for b, p in zip(rhsRows[i], pivotRhs)]
+
+        for j in touched:
+            if not done[j]:
+                heapq.heappush(heap, (len(columnRows[j]), j))
+        pivots.append((r, c))
+
+    pivotRows = {r for r, _ in pivots}
+    pivotColumns = {c for _, c in pivots}
+
+    def back_substitute(values, x):
+        for (r, c), b in zip(reversed(pivots), reversed(values)):
+            row = rows[r]
+            total = b
+            for j, a in row.items():
+                if j != c:
+                    total -= a * x[j]
+            x[c] = total / row[c]
+        return x
+
+    solutions = []
+    for k in range(systems):
+        if any(abs(rhsRows[i][k]) > rhsThreshold for i in range(rowCount) if i not in pivotRows):
+            solutions.append(None)
+        else:
+            solutions.append(back_substitute([rhsRows[r][k] for r, _ in pivots], [zero] * columnCount))
+
+    nullspace = []
+    for free in range(columnCount):
+        if free not in pivotColumns:
+            x = [zero] * columnCount
+            x[free] = zero + 1
+            nullspace.append(back_substitute([zero] * len(pivots), x))
+
+    return Solution(len(pivots), solutions[0] if single else solutions, nullspace)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
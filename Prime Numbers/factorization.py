@@ -0,0 +1,136 @@
+from math import gcd, isqrt
+from random import Random
+
+import numpy as np
+
+from prime import SMALL_PRIMES, _is_prime, base_primes
+
+TRIAL_PRIMES = sorted(SMALL_PRIMES)
+SPF_LIMIT = 1 << 22  # factorize_many answers values up to this from a smallest-prime-factor table
+
+_rng = Random(0)
+
+
+def pollard_brent(n):
+	"""A non-trivial factor of the odd composite n, using Brent's cycle finding with batched gcds."""
+	while True:
+		y, c, m = _rng.randrange(1, n), _rng.randrange(1, n), 128
+		g = r = q = 1
+
+		while g == 1:
+			x = y
+			for _ in range(r):
+				y = (y * y + c) % n
+
+			k = 0
+			while k < r and g == 1:
+				ys = y
+				for _ in range(min(m, r - k)):
+					y = (y * y + c) % n
+					q = q * abs(x - y) % n
+				g = gcd(q, n)
+				k += m
+			r <<= 1
+
+		if g == n:  # The batch overshot, step back one term at a time
+			g = 1
+			while g == 1:
+				ys = (ys * ys + c) % n
+				g = gcd(abs(x - ys), n)
+
+		if g != n:
+			return g
+
+
+def _add_factor(factors, p, exponent=1):
+	factors[p] = factors.get(p, 0) + exponent
+
+
+def _factor_cofactor(n, factors):
+	"""Splits n (free of trial-division primes) with Pollard-Brent until every part passes the primality test."""
+	stack = [n]
+	while stack:
+		m = stack.pop()
+		if m == 1:
+			continue
+		if _is_prime(m):
+			_add_factor(factors, m)
+			continue
+
+		root = isqrt(m)
+		if root * root == m:
+			stack += [root, root]
+			continue
+
+		d = pollard_brent(m)
+		stack += [d, m // d]
+
+
+def factorize(n):
+	"""Prime factorization of n >= 1 as {prime: multiplicity}, in increasing order of the primes."""
+	if n < 1:
+		raise ValueError(f"Can only factorize positive integers, got {n}")
+
+	factors = {}
+	for p in TRIAL_PRIMES:
+		if p * p > n:
+			break
+		if n % p == 0:
+			exponent = 0
+			while n % p == 0:
+				n //= p
+				exponent += 1
+			_add_factor(factors, p, exponent)
+
+	if n > 1:
+		if n < TRIAL_PRIMES[-1] ** 2:
+			_add_factor(factors, n)  # Nothing below the largest trial prime divides it
+		else:
+			_factor_cofactor(n, factors)
+
+	return dict(sorted(factors.items()))
+
+
+def smallest_prime_factors(N):
+	"""
+	spf[n] is the smallest prime factor of n for 2 <= n <= N (spf[0] = spf[1] = 0).
+	The base primes are struck from largest to smallest so each composite ends up with its least factor.
+	"""
+	spf = np.zeros(N + 1, dtype=np.int64)
+	for p in base_primes(isqrt(N))[::-1].tolist():
+		spf[p * p::p] = p
+
+	unmarked = np.flatnonzero(spf == 0)
+	spf[unmarked] = unmarked
+	spf[:2] = 0
+	return spf
+
+
+def factorize_with_table(n, spf):
+	factors = {}
+	while n > 1:
+		p = int(spf[n])
+		_add_factor(factors, p)
+		n //= p
+
+	return factors
+
+
+def factorize_all(N):
+	"""Yields (n, factorization) for every 2 <= n <= N, in O(log n) table lookups each."""
+	spf = smallest_prime_factors(N)
+	for n in range(2, N + 1):
+		yield n, factorize_with_table(n, spf)
+
+
+def factorize_many(values, spfLimit=SPF_LIMIT):
+	"""Factorizations of a batch of positive integers; the small ones share a single smallest-prime-factor table."""
+	values = [int(v) for v in values]
+	tableLimit = min(max(values, default=0), spfLimit)
+	spf = smallest_prime_factors(tableLimit) if tableLimit >= 2 else None
+
+	return [factorize_with_table(n, spf) if n <= tableLimit and n >= 1 else factorize(n) for n in values]
+
+
+# print(factorize(2 ** 64 + 1))
+# print(factorize_many([360, 1001, 2 ** 61 - 1, 10 ** 18 + 9]))
@@ -1,38 +1,621 @@
+import mmap
+import operator
+import os
+import struct
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import repeat
+from math import gcd, isqrt, prod
+from multiprocessing import shared_memory
+from random import Random
+
+import numpy as np
+
+try:
+	import fcntl
+except ImportError:
+	fcntl = None
+
 from Timing.timing import timing
 
+SEGMENT_SIZE = 1 << 21  # Odd numbers per segment (one uint8 flag each -> 2 MB)
+BITSET_CHUNK = 1 << 16  # Bytes of a PrimeBitset unpacked or counted at a time (512 K flags)
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)  # Set bits per byte value
+
+
+class PrimeBitset:
+	"""
+	Compact primality flags for 0..limit.
+
+	Only odd numbers are stored, one bit each, so n is prime iff n == 2 or bit n // 2 is set.
+	Indexing keeps the old `isPrime[n]` semantics while iterating yields the primes themselves.
+	"""
+
+	def __init__(self, limit, bits):
+		self.limit = limit
+		self.bits = bits
+
+	def __getitem__(self, n):
+		if n < 0 or n > self.limit:
+			raise IndexError(n)
+		if n & 1 == 0:
+			return n == 2
+
+		k = n >> 1
+		return bool(self.bits[k >> 3] >> (k & 7) & 1)
+
+	def __contains__(self, n):
+		return 0 <= n <= self.limit and self[n]
+
+	def _chunks(self):
+		"""(first flag index, bytes) over the bitset in BITSET_CHUNK pieces, the bits past limit masked off."""
+		oddCount = (self.limit + 1) // 2
+		byteCount = (oddCount + 7) // 8
+		for start in range(0, byteCount, BITSET_CHUNK):
+			chunk = self.bits[start:min(start + BITSET_CHUNK, byteCount)]
+			if start + len(chunk) == byteCount and oddCount % 8:
+				chunk = chunk.copy()
+				chunk[-1] &= (1 << oddCount % 8) - 1
+			yield start * 8, chunk
+
+	def __iter__(self):
+		if self.limit >= 2:
+			yield 2
+
+		for offset, chunk in self._chunks():  # Bounded memory: one unpacked chunk at a time
+			for k in np.flatnonzero(np.unpackbits(chunk, bitorder="little")):
+				yield 2 * (offset + int(k)) + 1
+
+	def count(self):
+		return sum(int(POPCOUNT[chunk].sum(dtype=np.int64)) for _, chunk in self._chunks()) + (self.limit >= 2)
+
+	@property
+	def nbytes(self):
+		return self.bits.nbytes
+
+
+def base_primes(n):
+	"""Plain odd-only sieve for the (small) primes up to n, used to strike segments."""
+	if n < 2:
+		return np.zeros(0, dtype=np.int64)
+
+	isOddPrime = np.ones((n + 1) // 2, dtype=np.uint8)  # index k <-> 2k + 1
+	isOddPrime[0] = 0
+
+	for k in range(1, (isqrt(n) - 1) // 2 + 1):
+		if isOddPrime[k]:
+			p = 2 * k + 1
+			isOddPrime[p * p // 2::p] = 0
+
+	return np.concatenate(([2], 2 * np.flatnonzero(isOddPrime) + 1)).astype(np.int64)
+
+
+def sieve_segment(lo, hi, basePrimes):
+	"""
+	Flags for the odd numbers in [lo, hi), lo odd: index i <-> lo + 2i.
+	basePrimes must contain every prime up to sqrt(hi).
+	"""
+	flags = np.ones((hi - lo + 1) // 2, dtype=np.uint8)
+
+	for p in basePrimes[1:]:  # 2 never divides an odd number
+		p = int(p)
+		start = p * p
+		if start >= hi:
+			break
+		if start < lo:
+			start = lo + (-lo) % p
+			if start & 1 == 0:
+				start += p
+		flags[(start - lo) >> 1::p] = 0
+
+	if lo == 1 and hi > 1:
+		flags[0] = 0
+
+	return flags
+
+
+def segments(lo, hi, segmentSize=SEGMENT_SIZE, basePrimes=None):
+	"""Sieves [lo, hi) one segment at a time, yielding (segmentLo, flags) with segmentLo odd."""
+	lo |= 1
+	if basePrimes is None:
+		basePrimes = base_primes(isqrt(max(hi - 1, 0)))
+
+	span = 2 * segmentSize
+	for segmentLo in range(lo, hi, span):
+		segmentHi = min(segmentLo + span, hi)
+		yield segmentLo, sieve_segment(segmentLo, segmentHi, basePrimes)
+
+
+def _count_flags(flags):
+	return int(np.count_nonzero(flags))
+
+
+def _pack_flags(flags):
+	return np.packbits(flags, bitorder="little")
+
+
+_sharedMemory = None
+_sharedBasePrimes = None
+
+
+def _attach_base_primes(name, count):
+	"""Worker initializer: map the parent's base primes instead of receiving a copy with every task."""
+	global _sharedMemory, _sharedBasePrimes
+
+	_sharedMemory = shared_memory.SharedMemory(name=name)
+	_sharedBasePrimes = np.ndarray((count,), dtype=np.int64, buffer=_sharedMemory.buf)
+
+
+def _sieve_shared_segment(lo, hi, task):
+	return task(sieve_segment(lo, hi, _sharedBasePrimes))
 
-@timing
-def primes(n):
-	isPrime = [True] * (n + 1)
-	isPrime[0] = False
-	isPrime[1] = False
 
-	i = 2
-	while i * i <= n:
-		if isPrime[i]:
-			for j in range(i * i, n + 1, i):
-				isPrime[j] = False
+def map_segments(lo, hi, task, segmentSize=SEGMENT_SIZE, workers=1):
+	"""
+	Yields task(flags) for every segment of [lo, hi) in order.
+	With workers > 1 (None: one per CPU) the segments are sieved in a process pool sharing the base primes.
+	"""
+	if workers == 1:
+		for _, flags in segments(lo, hi, segmentSize):
+			yield task(flags)
+		return
 
-		i += 1
+	lo |= 1
+	basePrimes = base_primes(isqrt(max(hi - 1, 0)))
+	memory = shared_memory.SharedMemory(create=True, size=max(basePrimes.nbytes, 1))
+	try:
+		shared = np.ndarray(basePrimes.shape, dtype=np.int64, buffer=memory.buf)
+		shared[:] = basePrimes
+		del shared
 
-	return isPrime
+		span = 2 * segmentSize
+		starts = range(lo, hi, span)
+		ends = [min(start + span, hi) for start in starts]
+		with ProcessPoolExecutor(workers, initializer=_attach_base_primes, initargs=(memory.name, len(basePrimes))) as pool:
+			yield from pool.map(_sieve_shared_segment, starts, ends, repeat(task, len(ends)))
+	finally:
+		memory.close()
+		memory.unlink()
+
+
+CACHE_MAGIC = b"PRIMEBIT"
+CACHE_HEADER = struct.Struct("<8sQ")  # Magic, number of bitmap bytes
+PRIME_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "primes.bin")
+
+_primeCache = None
+
+
+@contextmanager
+def _file_lock(file, exclusive):
+	if fcntl is None:  # No advisory locks on this platform, only safe within a single process
+		yield
+		return
+
+	fcntl.flock(file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+	try:
+		yield
+	finally:
+		fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+class PrimeCache:
+	"""
+	Odd-only prime bitmap persisted to a file and memory-mapped for O(1) lookups.
+
+	The file holds a header followed by PrimeBitset bits. Its limit is always 16 * byteCount - 1, so extending it
+	only appends whole bytes and then bumps the header under an exclusive lock: bits a reader has already mapped
+	never change, and readers only take a shared lock while reading the header.
+	"""
+
+	def __init__(self, path=PRIME_CACHE_PATH):
+		self.path = path
+		self.bitset = PrimeBitset(-1, np.zeros(0, dtype=np.uint8))
+
+		with os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o644), "r+b") as file, _file_lock(file, True):
+			if os.fstat(file.fileno()).st_size < CACHE_HEADER.size:
+				file.write(CACHE_HEADER.pack(CACHE_MAGIC, 0))
+
+		self.refresh()
+
+	@property
+	def limit(self):
+		return self.bitset.limit
+
+	def _read_header(self, file):
+		magic, byteCount = CACHE_HEADER.unpack(file.read(CACHE_HEADER.size))
+		if magic != CACHE_MAGIC:
+			raise ValueError(f"{self.path} is not a prime cache")
+		return byteCount
+
+	def refresh(self):
+		"""Re-maps the file to pick up extensions made by other processes."""
+		with open(self.path, "rb") as file, _file_lock(file, False):
+			byteCount = self._read_header(file)
+			if byteCount <= len(self.bitset.bits):
+				return
+			mapped = mmap.mmap(file.fileno(), CACHE_HEADER.size + byteCount, access=mmap.ACCESS_READ)
+
+		self.bitset = PrimeBitset(16 * byteCount - 1, np.frombuffer(mapped, np.uint8, byteCount, CACHE_HEADER.size))
+
+	def extend(self, n, segmentSize=SEGMENT_SIZE, workers=1):
+		"""Sieves only the numbers between the cached limit and n and appends them to the file."""
+		segmentSize -= segmentSize % 8
+		target = n // 16 + 1
+
+		with open(self.path, "r+b") as file, _file_lock(file, True):
+			byteCount = self._read_header(file)
+			if byteCount < target:
+				file.seek(CACHE_HEADER.size + byteCount)
+				for packed in map_segments(16 * byteCount + 1, 16 * target, _pack_flags, segmentSize, workers):
+					file.write(packed.tobytes())
+				file.flush()
+				os.fsync(file.fileno())
+
+				file.seek(0)
+				file.write(CACHE_HEADER.pack(CACHE_MAGIC, target))
+				file.flush()
+
+		self.refresh()
+
+	def primes(self, n, segmentSize=SEGMENT_SIZE, workers=1):
+		if n > self.limit:
+			self.extend(n, segmentSize, workers)
+		return PrimeBitset(n, self.bitset.bits[:n // 16 + 1])
+
+	def __getitem__(self, n):
+		return self.bitset[n]
+
+
+def use_prime_cache(path=PRIME_CACHE_PATH, limit=None):
+	"""
+	Makes primes() and is_prime() consult (and primes() extend) the on-disk bitmap at path; None turns it off.
+	is_prime() never extends the file, queries above the cached limit use the primality test instead.
+	"""
+	global _primeCache
+
+	_primeCache = PrimeCache(path) if path is not None else None
+	if _primeCache is not None and limit is not None and limit > _primeCache.limit:
+		_primeCache.extend(limit)
+
+	return _primeCache
+
+
+def _primes(n, segmentSize=SEGMENT_SIZE, workers=1):
+	if _primeCache is not None:
+		return _primeCache.primes(n, segmentSize, workers)
+
+	segmentSize -= segmentSize % 8  # Keep segments byte aligned so they can be packed independently
+	bits = np.zeros(((n + 1) // 2 + 7) // 8, dtype=np.uint8)
+
+	for i, packed in enumerate(map_segments(1, n + 1, _pack_flags, segmentSize, workers)):
+		offset = i * segmentSize >> 3
+		bits[offset:offset + len(packed)] = packed
+
+	return PrimeBitset(n, bits)
 
 
 @timing
-def is_prime(n):
-	if n == 2:
+def primes(n, segmentSize=SEGMENT_SIZE, workers=1):
+	return _primes(n, segmentSize, workers)
+
+
+def iter_primes(n, segmentSize=SEGMENT_SIZE):
+	"""Lazily yields the primes up to n, holding a single segment in memory at a time."""
+	return PrimeStream(0, n + 1, segmentSize)
+
+
+PrimeStreamCheckpoint = namedtuple("PrimeStreamCheckpoint", ["position", "stop"])
+
+
+class PrimeStream:
+	"""
+	Iterator over the primes in [start, stop) in increasing order (stop=None never ends).
+
+	Segments are sieved on demand and only the base primes up to sqrt of the current segment end are kept.
+	checkpoint() returns a token that resume() turns back into a stream continuing after the last yielded prime.
+	"""
+
+	def __init__(self, start=0, stop=None, segmentSize=SEGMENT_SIZE):
+		self.position = max(start, 0)  # Smallest number that has not been yielded or skipped yet
+		self.stop = stop
+		self.segmentSize = segmentSize
+
+		self._sieved = self.position  # Everything below this is either yielded or pending
+		self._pending = iter(())
+		self._basePrimes = base_primes(0)
+		self._baseLimit = 0
+
+	@classmethod
+	def resume(cls, checkpoint, segmentSize=SEGMENT_SIZE):
+		return cls(checkpoint.position, checkpoint.stop, segmentSize)
+
+	def checkpoint(self):
+		return PrimeStreamCheckpoint(self.position, self.stop)
+
+	def __iter__(self):
+		return self
+
+	def __next__(self):
+		p = next(self._pending, None)
+		while p is None:
+			self._sieve_next_segment()
+			p = next(self._pending, None)
+
+		self.position = p + 1
+		return p
+
+	def _sieve_next_segment(self):
+		lo = self._sieved
+		if self.stop is not None and lo >= self.stop:
+			self.position = max(self.position, self.stop)
+			raise StopIteration
+
+		hi = lo + 2 * self.segmentSize
+		if self.stop is not None:
+			hi = min(hi, self.stop)
+
+		root = isqrt(hi - 1)
+		if root > self._baseLimit:
+			self._baseLimit = 2 * root  # Grow geometrically so an unbounded stream rarely re-sieves its base primes
+			if self.stop is not None:
+				self._baseLimit = min(self._baseLimit, isqrt(self.stop - 1))
+			self._basePrimes = base_primes(self._baseLimit)
+
+		segmentLo = lo | 1
+		found = (segmentLo + 2 * np.flatnonzero(sieve_segment(segmentLo, hi, self._basePrimes))).tolist()
+		if lo <= 2 < hi:
+			found.insert(0, 2)
+
+		self._pending = iter(found)
+		self._sieved = hi
+
+
+def count_primes(n, segmentSize=SEGMENT_SIZE, workers=1):
+	"""pi(n), the number of primes up to n, counted segment by segment without materializing them."""
+	return (n >= 2) + sum(map_segments(3, n + 1, _count_flags, segmentSize, workers))
+
+
+def benchmark_parallel_sieve(n=10 ** 9, maxWorkers=None):
+	for workers in range(1, (maxWorkers or os.cpu_count()) + 1):
+		timing(count_primes, printEvery=1)(n, workers=workers)
+
+
+SMALL_PRIMES = frozenset(base_primes(1000).tolist())
+SMALL_PRIMORIAL = prod(SMALL_PRIMES)
+MILLER_RABIN_BASES = (2, 325, 9375, 28178, 450775, 9780504, 1795265022)  # Sinclair's set, deterministic for n < 2^64
+
+
+def _is_strong_probable_prime(n, a):
+	"""Miller-Rabin round: False means n is certainly composite."""
+	a %= n
+	if a == 0:
 		return True
-	elif n & 1 == 0 or n < 2:
-		return False
 
-	d = 3
-	while d * d <= n:
-		if n % d == 0:
+	d, s = n - 1, 0
+	while d & 1 == 0:
+		d >>= 1
+		s += 1
+
+	x = pow(a, d, n)
+	if x == 1 or x == n - 1:
+		return True
+
+	for _ in range(s - 1):
+		x = x * x % n
+		if x == n - 1:
+			return True
+
+	return False
+
+
+def _jacobi(a, n):
+	a %= n
+	result = 1
+	while a:
+		while a & 1 == 0:
+			a >>= 1
+			if n & 7 in (3, 5):
+				result = -result
+		a, n = n, a
+		if a & 3 == 3 and n & 3 == 3:
+			result = -result
+		a %= n
+
+	return result if n == 1 else 0
+
+
+def _is_strong_lucas_probable_prime(n):
+	"""Strong Lucas test with Selfridge's parameters, the second half of BPSW. n must be odd and not a square."""
+	D = 5
+	while True:
+		j = _jacobi(D, n)
+		if j == -1:
+			break
+		if j == 0 and abs(D) != n:
 			return False
-		d += 2
+		D = -D - 2 if D > 0 else -D + 2
+
+	P, Q = 1, (1 - D) // 4
+
+	d, s = n + 1, 0
+	while d & 1 == 0:
+		d >>= 1
+		s += 1
+
+	def half(x):
+		x %= n
+		return (x + n if x & 1 else x) >> 1
+
+	U, V, Qk = 1, P, Q % n
+	for bit in bin(d)[3:]:
+		U = U * V % n
+		V = (V * V - 2 * Qk) % n
+		Qk = Qk * Qk % n
+		if bit == "1":
+			U, V = half(P * U + V), half(D * U + P * V)
+			Qk = Qk * Q % n
+
+	if U == 0 or V == 0:
+		return True
+
+	for _ in range(s - 1):
+		V = (V * V - 2 * Qk) % n
+		if V == 0:
+			return True
+		Qk = Qk * Qk % n
+
+	return False
+
+
+def _is_prime(n):
+	if n < 1000:
+		return n in SMALL_PRIMES
+	if _primeCache is not None and n <= _primeCache.limit:
+		return _primeCache[n]
+	if gcd(n, SMALL_PRIMORIAL) != 1:
+		return False
+	if n < 1000 * 1000:
+		return True  # No prime factor below 1000
+
+	if n < 1 << 64:
+		return all(_is_strong_probable_prime(n, a) for a in MILLER_RABIN_BASES)
+
+	# Baillie-PSW: no composite passing both halves is known
+	if not _is_strong_probable_prime(n, 2):
+		return False
+	if isqrt(n) ** 2 == n:
+		return False
+	return _is_strong_lucas_probable_prime(n)
+
+
+@timing
+def is_prime(n):
+	return _is_prime(n)
+
+
+SIEVE_LIMIT = 1 << 24  # Batch queries below this are answered from a 1 MB sieve bitmap
+
+_U32 = np.uint64(0xFFFFFFFF)
+_sieveCache = None
+
+
+def _mulhi(a, b):
+	"""High 64 bits of the 128-bit products a * b (uint64 arrays), via 32-bit limbs."""
+	aLo, aHi = a & _U32, a >> np.uint64(32)
+	bLo, bHi = b & _U32, b >> np.uint64(32)
+
+	loLo = aLo * bLo
+	hiLo = aHi * bLo
+	loHi = aLo * bHi
+	middle = (loLo >> np.uint64(32)) + (hiLo & _U32) + (loHi & _U32)
+
+	return aHi * bHi + (hiLo >> np.uint64(32)) + (loHi >> np.uint64(32)) + (middle >> np.uint64(32))
+
+
+def _montgomery_multiply(a, b, n, nPrime):
+	"""a * b / 2^64 mod n, elementwise, for odd n < 2^63 and nPrime = -1 / n mod 2^64."""
+	low = a * b
+	t = _mulhi(a, b) + _mulhi(low * nPrime, n) + (low != 0).astype(np.uint64)
+	return np.where(t >= n, t - n, t)
+
+
+def _strong_probable_prime_mask(n, a):
+	"""Vectorized Miller-Rabin round with base a over an array of odd n in (2, 2^63)."""
+	inverse = n.copy()  # Correct to 3 bits since n * n == 1 (mod 8); each Newton step doubles that
+	for _ in range(5):
+		inverse *= np.uint64(2) - n * inverse
+	nPrime = ~inverse + np.uint64(1)
+
+	one = (~n + np.uint64(1)) % n  # 2^64 mod n, i.e. 1 in Montgomery form
+	minusOne = n - one
+	rSquared = one.copy()
+	for _ in range(64):
+		rSquared <<= np.uint64(1)
+		rSquared = np.where(rSquared >= n, rSquared - n, rSquared)
+
+	d = n - np.uint64(1)
+	s = np.zeros_like(d)
+	even = d & np.uint64(1) == 0
+	while even.any():
+		d = np.where(even, d >> np.uint64(1), d)
+		s += even
+		even = d & np.uint64(1) == 0
+
+	base = np.uint64(a) % n
+	trivial = base == 0
+	base = _montgomery_multiply(base, rSquared, n, nPrime)
+
+	x = one
+	for bit in range(int(d.max()).bit_length()):
+		x = np.where(d >> np.uint64(bit) & np.uint64(1), _montgomery_multiply(x, base, n, nPrime), x)
+		base = _montgomery_multiply(base, base, n, nPrime)
+
+	passed = trivial | (x == one) | (x == minusOne)
+	for r in range(1, int(s.max())):
+		x = _montgomery_multiply(x, x, n, nPrime)
+		passed |= (r < s) & (x == minusOne)
+
+	return passed
+
+
+def is_prime_array(values, sieveLimit=SIEVE_LIMIT):
+	"""
+	Primality mask for an integer array.
+	Values up to sieveLimit are looked up in a cached sieve bitmap, the rest go through vectorized Miller-Rabin.
+	"""
+	global _sieveCache
+
+	values = np.asarray(values)
+	if values.dtype != object and values.dtype.kind not in "iub":
+		raise TypeError(f"is_prime_array needs integers, got {values.dtype}")
+	if values.dtype == object or (values.dtype == np.uint64 and values.size and values.max() >= 1 << 63):
+		return np.array([_is_prime(operator.index(v)) for v in values.flat], dtype=bool).reshape(values.shape)
+
+	n = values.astype(np.int64).ravel()
+	result = np.zeros(n.shape, dtype=bool)
+
+	if _sieveCache is None or _sieveCache.limit < sieveLimit:
+		_sieveCache = _primes(sieveLimit)
+	sieved = (n >= 0) & (n <= sieveLimit) & (n & 1 == 1)
+	k = n[sieved] >> 1
+	result[sieved] = _sieveCache.bits[k >> 3] >> (k & 7) & 1 == 1
+	result[n == 2] = True  # The only even prime; Miller-Rabin below only sees odd n >= 3
+
+	index = np.flatnonzero((n > max(sieveLimit, 2)) & (n & 1 == 1))
+	candidates = n[index].astype(np.uint64)
+
+	for p in sorted(SMALL_PRIMES)[1:]:  # Trial division by the odd primes below 1000
+		keep = (candidates % np.uint64(p) != 0) | (candidates == np.uint64(p))
+		index, candidates = index[keep], candidates[keep]
+
+	for a in MILLER_RABIN_BASES:
+		if not len(candidates):
+			break
+		keep = _strong_probable_prime_mask(candidates, a)
+		index, candidates = index[keep], candidates[keep]
+
+	result[index] = True
+	return result.reshape(values.shape)
+
+
+@timing(printEvery=1)
+def benchmark_is_prime_array(count=10 ** 6, bits=63, seed=0):
+	rng = np.random.default_rng(seed)
+	return int(is_prime_array(rng.integers(0, 1 << bits, count, dtype=np.int64)).sum())
+
 
-	return True
+@timing(printEvery=1)
+def benchmark_is_prime(count=10 ** 6, bits=64, seed=0):
+	rng = Random(seed)
+	return sum(_is_prime(rng.getrandbits(bits)) for _ in range(count))
 
 
+# use_prime_cache(limit=10 ** 9)
 # primes(3314192745)
+# print(list(itertools.islice(PrimeStream(10 ** 12), 10)))
+# print(count_primes(10 ** 10, workers=None))
+# benchmark_parallel_sieve(10 ** 9)
 # print(is_prime(30313))
+# benchmark_is_prime(10 ** 6)
+# benchmark_is_prime_array(10 ** 6)
@@ -1,30 +1,35 @@
 import pygame
 import numpy as np
-from numpy import array, sin, cos, tan, deg2rad, rad2deg
-from vector3d import Vector3D
+from numpy import array, tan, deg2rad
+from quaternion import Quaternion
+from vector3d import Vector3D, Vector3DArray
+
+CIRCLE_LIMIT = 2000  # Above this many visible vertices, render plots single pixels instead of circles
 
 
 class Transform:
 	"""
     A component to keep track of the transform of an object (position, rotation, scale).
     Every object that exists in the "world" will inherit from this.
+
+    Matrices and local vectors are recomputed lazily, on the first read after a change. Transforms can be
+    nested with parent: world matrices compose the parents' and are cached until something above changes.
+    Rotations are kept as a Quaternion (orientation); rotation gives the same as Euler angles in degrees.
     """
 
-	def __init__(self, position: Vector3D, rotation: Vector3D, scale: Vector3D):
+	def __init__(self, position: Vector3D, rotation: Vector3D, scale: Vector3D, parent: "Transform" = None):
 		self._pos = position
 		self._rot = rotation
+		self._orientation = Quaternion.from_euler(rotation)
 		self._scale = scale
 
-		self.transformMatrix = np.zeros((4, 4))
-		self.rotationMatrix = np.zeros((4, 4))
-		self.worldToLocalMatrix = np.zeros((4, 4))
-		self.localToWorldMatrix = np.zeros((4, 4))
-		self.__calculate_matrices()
+		self._matricesDirty = True  # Local matrices (relative to the parent)
+		self._vectorsDirty = True  # forward / up / right
+		self._worldDirty = True  # World matrices, composed with the parents'
 
-		self.forward = Vector3D.forward
-		self.up = Vector3D.up
-		self.right = Vector3D.right
-		self.__calculate_local_vectors()
+		self._parent = None
+		self.children = []
+		self.parent = parent
 
 	@property
 	def position(self):
@@ -33,7 +38,8 @@ class Transform:
 	@position.setter
 	def position(self, newPos: Vector3D):
 		self._pos = newPos
-		self.__calculate_matrices()
+		self._matricesDirty = True
+		self._invalidate_world()
 
 	@property
 	def rotation(self):
@@ -42,8 +48,26 @@ class Transform:
 	@rotation.setter
 	def rotation(self, newRot: Vector3D):
 		self._rot = newRot
-		self.__calculate_matrices()
-		self.__calculate_local_vectors()
+		self._orientation = Quaternion.from_euler(newRot)
+		self._matricesDirty = True
+		self._vectorsDirty = True
+		self._invalidate_world()
+
+	@property
+	def orientation(self) -> Quaternion:
+		return self._orientation
+
+	@orientation.setter
+	def orientation(self, newOrientation: Quaternion):
+		self._orientation = newOrientation.normalized
+		self._rot = self._orientation.to_euler()
+		self._matricesDirty = True
+		self._vectorsDirty = True
+		self._invalidate_world()
+
+	def rotate_by(self, rotation: Quaternion):
+		"""Applies rotation after the current one (around the parent's axes), without going through Euler angles."""
+		self.orientation = rotation * self._orientation
 
 	@property
 	def scale(self):
@@ -52,17 +76,96 @@ class Transform:
 	@scale.setter
 	def scale(self, newScale: Vector3D):
 		self._scale = newScale
-		self.__calculate_matrices()
+		self._matricesDirty = True
+		self._invalidate_world()
 
-	def __calculate_local_vectors(self):
-		self.forward = self.rotate(-Vector3D.forward, self.rotation).normalized
-		self.up = self.rotate(Vector3D.up, self.rotation).normalized
-		self.right = self.forward.cross(self.up).normalized
+	@property
+	def parent(self):
+		return self._parent
+
+	@parent.setter
+	def parent(self, newParent: "Transform"):
+		if self._parent is not None:
+			self._parent.children.remove(self)
+		self._parent = newParent
+		if newParent is not None:
+			newParent.children.append(self)
+
+		self._worldDirty = False  # Forces the walk below to reach the whole subtree
+		self._invalidate_world()
+
+	def _invalidate_world(self):
+		"""Marks the world matrices of this subtree stale. A stale node's descendants are stale already, so the walk stops there."""
+		stack = [self]
+		while stack:
+			transform = stack.pop()
+			if not transform._worldDirty:
+				transform._worldDirty = True
+				stack.extend(transform.children)
+
+	@property
+	def forward(self):
+		if self._vectorsDirty:
+			self.__calculate_local_vectors()
+		return self._forward
+
+	@property
+	def up(self):
+		if self._vectorsDirty:
+			self.__calculate_local_vectors()
+		return self._up
+
+	@property
+	def right(self):
+		if self._vectorsDirty:
+			self.__calculate_local_vectors()
+		return self._right
+
+	@property
+	def rotationMatrix(self):
+		if self._matricesDirty:
+			self.__calculate_matrices()
+		return self._rotationMatrix
+
+	@property
+	def transformMatrix(self):
+		if self._matricesDirty:
+			self.__calculate_matrices()
+		return self._transformMatrix
+
+	@property
+	def localMatrix(self):
+		"""Local space -> parent space."""
+		if self._matricesDirty:
+			self.__calculate_matrices()
+		return self._localMatrix
+
+	@property
+	def parentToLocalMatrix(self):
+		if self._matricesDirty:
+			self.__calculate_matrices()
+		return self._parentToLocalMatrix
 
-		print(self.forward, self.up, self.right)
+	@property
+	def localToWorldMatrix(self):
+		if self._worldDirty:
+			self.__calculate_world_matrices()
+		return self._localToWorldMatrix
+
+	@property
+	def worldToLocalMatrix(self):
+		if self._worldDirty:
+			self.__calculate_world_matrices()
+		return self._worldToLocalMatrix
+
+	def __calculate_local_vectors(self):
+		self._forward = self._orientation.rotate(-Vector3D.forward).normalized
+		self._up = self._orientation.rotate(Vector3D.up).normalized
+		self._right = self._forward.cross(self._up).normalized
+		self._vectorsDirty = False
 
 	def __calculate_matrices(self):
-		rotation = self.__get_rotation_matrix(self.rotation)
+		rotation = self._orientation.to_matrix()
 
 		scale = np.array([[self.scale.x, 0, 0, 0],
 		                  [0, self.scale.y, 0, 0],
@@ -74,51 +177,29 @@ class Transform:
 		                        [0, 0, 1, 0],
 		                        [self.position.x, self.position.y, self.position.z, 1]])
 
-		self.rotationMatrix = rotation
-		self.transformMatrix = np.array([[1, 0, 0, 0],
-		                                 [0, 1, 0, 0],
-		                                 [0, 0, 1, 0],
-		                                 [-self.position.x, -self.position.y, -self.position.z, 1]])
-
-		self.worldToLocalMatrix = np.dot(self.rotationMatrix, self.transformMatrix)
-		self.localToWorldMatrix = np.dot(np.dot(rotation, scale), translation)
+		self._rotationMatrix = rotation
+		self._transformMatrix = np.array([[1, 0, 0, 0],
+		                                  [0, 1, 0, 0],
+		                                  [0, 0, 1, 0],
+		                                  [-self.position.x, -self.position.y, -self.position.z, 1]])
+
+		self._parentToLocalMatrix = np.dot(self._rotationMatrix, self._transformMatrix)
+		self._localMatrix = np.dot(np.dot(rotation, scale), translation)
+		self._matricesDirty = False
+
+	def __calculate_world_matrices(self):
+		if self._parent is None:
+			self._localToWorldMatrix = self.localMatrix
+			self._worldToLocalMatrix = self.parentToLocalMatrix
+		else:  # Row vectors: local -> parent -> world, and world -> parent -> local
+			self._localToWorldMatrix = np.dot(self.localMatrix, self._parent.localToWorldMatrix)
+			self._worldToLocalMatrix = np.dot(self._parent.worldToLocalMatrix, self.parentToLocalMatrix)
+		self._worldDirty = False
 
 	@staticmethod
 	def rotate(vector: Vector3D, angles: Vector3D):
-		rotationX = array([[1, 0, 0],
-		                   [0, cos(angles.x), sin(angles.x)],
-		                   [0, -sin(angles.x), cos(angles.x)]])
-
-		rotationY = array([[cos(angles.y), 0, -sin(angles.y)],
-		                   [0, 1, 0],
-		                   [sin(angles.y), 0, cos(angles.y)]])
-
-		rotationZ = array([[cos(angles.z), sin(angles.z), 0],
-		                   [-sin(angles.z), cos(angles.z), 0],
-		                   [0, 0, 1]])
-
-		rotationMatrix = np.dot(rotationX, np.dot(rotationY, rotationZ))
-
-		return Vector3D(*np.dot(vector[:3], rotationMatrix))
-
-	@staticmethod
-	def __get_rotation_matrix(angles: Vector3D):
-		rotationX = np.array([[1, 0, 0, 0],
-		                      [0, cos(deg2rad(angles.x)), sin(deg2rad(angles.x)), 0],
-		                      [0, -sin(deg2rad(angles.x)), cos(deg2rad(angles.x)), 0],
-		                      [0, 0, 0, 1]])
-
-		rotationY = np.array([[cos(deg2rad(angles.y)), 0, -sin(deg2rad(angles.y)), 0],
-		                      [0, 1, 0, 0],
-		                      [sin(deg2rad(angles.y)), 0, cos(deg2rad(angles.y)), 0],
-		                      [0, 0, 0, 1]])
-
-		rotationZ = np.array([[cos(deg2rad(angles.z)), sin(deg2rad(angles.z)), 0, 0],
-		                      [-sin(deg2rad(angles.z)), cos(deg2rad(angles.z)), 0, 0],
-		                      [0, 0, 1, 0],
-		                      [0, 0, 0, 1]])
-
-		return np.dot(rotationX, np.dot(rotationY, rotationZ))
+		"""Rotates vector by Euler angles in degrees (like rotation); a Vector3DArray rotates every vector."""
+		return Quaternion.from_euler(angles).rotate(vector)
 
 
 class Face:
@@ -135,6 +216,22 @@ class Mesh:
 		self.transform = transform
 		self.vertices = vertices
 
+	@property
+	def vertices(self):
+		return self._vertices
+
+	@vertices.setter
+	def vertices(self, newVertices):
+		self._vertices = newVertices
+		self._vertexArray = None
+
+	@property
+	def vertexArray(self) -> Vector3DArray:
+		"""The vertices stacked once into an N x 4 array (assign vertices again after editing them in place)."""
+		if self._vertexArray is None:
+			self._vertexArray = self._vertices if isinstance(self._vertices, Vector3DArray) else Vector3DArray(self._vertices)
+		return self._vertexArray
+
 
 class Cube(Mesh):
 	"""
@@ -180,17 +277,41 @@ class Camera:
 		                               [0, 0, (self.far + self.near) / (self.far - self.near), -1],
 		                               [0, 0, 2 * self.far * self.near / (self.far - self.near), 0]])
 
-	def project(self, mesh: Mesh):
-		projectedVertices = []
-		for vertex in mesh.vertices:
-			relativeVertex = np.dot(vertex, self.transform.worldToLocalMatrix)  # Transform vertex into local camera space
-			projectedVertex = Vector3D(*np.dot(self.viewingTransform, relativeVertex))  # Project vertex into image space
-			projectedVertex /= projectedVertex.w  # Omg 4th dimension o_O
-			projectedVertices.append(projectedVertex)
-
-		return projectedVertices
-
-	def render(self, screenSize):
+	def projection_matrix(self, screenSize=None):
+		"""
+		World space -> camera space -> image space (-> screen space, centered, if screenSize is given) as one
+		4x4 matrix for row vectors, to be computed once per frame.
+		"""
+		matrix = np.dot(self.transform.worldToLocalMatrix, self.viewingTransform.T)
+
+		if screenSize is not None:
+			windowW, windowH = screenSize
+			screenSpaceTransform = array([[1, 0, 0, 0],
+			                              [0, 1, 0, 0],
+			                              [0, 0, 1, 0],
+			                              [windowW / 2, windowH / 2, 0, 1]])
+			matrix = np.dot(matrix, screenSpaceTransform)  # Center the vertex on the screen ((0,0) is top left)
+
+		return matrix
+
+	def project(self, mesh: Mesh, screenSize=None, clip=False):
+		"""
+		Projects every vertex of the mesh with one matmul and a vectorized perspective divide.
+		With clip=True also returns a mask of the vertices between the near and far planes.
+		"""
+		projected = mesh.vertexArray.transform(self.projection_matrix(screenSize)).components
+		w = projected[:, 3].copy()
+
+		with np.errstate(divide="ignore", invalid="ignore"):  # Vertices on the camera plane (w = 0) fail the clip test anyway
+			projected /= w[:, None]  # Omg 4th dimension o_O
+
+		if not clip:
+			return Vector3DArray.view(projected)
+
+		depth = -w * (self.far - self.near) / (2 * self.far * self.near)  # w is proportional to the camera space z
+		return Vector3DArray.view(projected), (depth >= self.near) & (depth <= self.far)
+
+	def render(self, screenSize, mesh: Mesh):
 		pygame.init()
 		windowW, windowH = screenSize
 		window = pygame.display.set_mode(screenSize)
@@ -223,25 +344,29 @@ class Camera:
 				self.transform.position += -self.transform.up * self.movementSpeed
 
 			if isKeyDown[pygame.K_q]:
-				self.transform.rotation += Vector3D(0, 0, 1) * self.rotationSpeed
+				self.transform.rotate_by(Quaternion.from_axis_angle(Vector3D(0, 0, 1), self.rotationSpeed))
 			if isKeyDown[pygame.K_e]:
-				self.transform.rotation += Vector3D(0, 0, -1) * self.rotationSpeed
+				self.transform.rotate_by(Quaternion.from_axis_angle(Vector3D(0, 0, -1), self.rotationSpeed))
 
 			window.fill((0, 0, 0))  # Clear screen
 
-			for vertex in cam.project(cube):
-				screenSpaceTransform = array([[1, 0, 0, 0],
-				                              [0, 1, 0, 0],
-				                              [0, 0, 1, 0],
-				                              [windowW / 2, windowH / 2, 0, 1]])
+			projected, visible = self.project(mesh, screenSize, clip=True)
+			points = projected.components[visible, :2].astype(int)  # We are now in screen-space -> forget about z and w
+			points = points[(points[:, 0] >= 0) & (points[:, 0] < windowW) & (points[:, 1] >= 0) & (points[:, 1] < windowH)]
 
-				screenSpaceVertex = np.dot(vertex, screenSpaceTransform)  # Center the vertex on the screen ((0,0) is top left)
-				pygame.draw.circle(window, (255, 255, 255), screenSpaceVertex[:2], 3)  # We are now in screen-space -> forget about z and w
+			if len(points) <= CIRCLE_LIMIT:
+				for point in points:
+					pygame.draw.circle(window, (255, 255, 255), point, 3)
+			else:
+				pixels = pygame.surfarray.pixels2d(window)
+				pixels[points[:, 0], points[:, 1]] = window.map_rgb((255, 255, 255))
+				del pixels  # Unlocks the surface
 
 			pygame.display.update()
 
 
-cam = Camera(Transform(Vector3D(0, 0, 2), Vector3D(0, 0, 0), Vector3D(1, 1, 1)), movementSpeed=0.0015)
-cube = Cube(Transform(Vector3D(0, 0, 0), Vector3D(0, 0, 0), Vector3D(1, 1, 1)))
+if __name__ == '__main__':
+	cam = Camera(Transform(Vector3D(0, 0, 2), Vector3D(0, 0, 0), Vector3D(1, 1, 1)), movementSpeed=0.0015)
+	cube = Cube(Transform(Vector3D(0, 0, 0), Vector3D(0, 0, 0), Vector3D(1, 1, 1)))
 
-cam.render((800, 800))
+	cam.render((800, 800), cube)
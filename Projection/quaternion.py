@@ -0,0 +1,184 @@
+import numpy as np
+from math import acos, asin, atan2, cos, degrees, radians, sin, sqrt
+
+from vector3d import Vector3D, Vector3DArray
+
+SLERP_LERP_THRESHOLD = 0.9995  # Above this cosine the arc is short enough to interpolate linearly
+
+
+class Quaternion(object):
+    """
+    Unit quaternion w + xi + yj + zk representing a rotation. Rotations compose by multiplication
+    (q2 * q1 applies q1 first) and only become a matrix when one is asked for. Angles are in degrees.
+    """
+
+    __slots__ = ("w", "x", "y", "z")
+
+    def __init__(self, w=1.0, x=0.0, y=0.0, z=0.0):
+        self.w = float(w)
+        self.x = float(x)
+        self.y = float(y)
+        self.z = float(z)
+
+    def __repr__(self):
+        return 'Quaternion({0}, {1}, {2}, {3})'.format(self.w, self.x, self.y, self.z)
+
+    @classmethod
+    def from_axis_angle(cls, axis, angle) -> 'Quaternion':
+        """
+        Rotation by angle degrees (counterclockwise) around axis.
+
+        :param axis: Vector3D
+        :param angle: Union[int, float]
+        :return: Quaternion
+
+        >>> Quaternion.from_axis_angle(Vector3D(0, 0, 2), 180)
+        Quaternion(6.123233995736766e-17, 0.0, 0.0, 1.0)
+        """
+
+        half = radians(angle) / 2
+        length = sqrt(axis.x ** 2 + axis.y ** 2 + axis.z ** 2)
+        s = sin(half) / length
+        return cls(cos(half), axis.x * s, axis.y * s, axis.z * s)
+
+    @classmethod
+    def from_euler(cls, angles: Vector3D) -> 'Quaternion':
+        """
+        Euler angles in degrees, applied around x first, then y, then z (as Transform's rotation).
+
+        :param angles: Vector3D
+        :return: Quaternion
+        """
+
+        hx, hy, hz = radians(angles.x) / 2, radians(angles.y) / 2, radians(angles.z) / 2
+        cx, sx, cy, sy, cz, sz = cos(hx), sin(hx), cos(hy), sin(hy), cos(hz), sin(hz)
+
+        return cls(cz * cy * cx + sz * sy * sx,  # qz * qy * qx, expanded
+                   cz * cy * sx - sz * sy * cx,
+                   cz * sy * cx + sz * cy * sx,
+                   sz * cy * cx - cz * sy * sx)
+
+    def to_euler(self) -> Vector3D:
+        """
+        The Euler angles (degrees, x then y then z) of this rotation; inverse of from_euler away from gimbal lock.
+
+        :return: Vector3D
+
+        >>> Quaternion.from_euler(Vector3D(10, 20, 30)).to_euler().components.round(6)
+        array([10., 20., 30.,  1.])
+        """
+
+        w, x, y, z = self.w, self.x, self.y, self.z
+        angleX = atan2(2 * (w * x + y * z), 1 - 2 * (x * x + y * y))
+        angleY = asin(max(-1.0, min(1.0, 2 * (w * y - z * x))))
+        angleZ = atan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z))
+
+        return Vector3D(degrees(angleX), degrees(angleY), degrees(angleZ))
+
+    def __mul__(self, other: 'Quaternion') -> 'Quaternion':
+        """
+        Hamilton product: the rotation other followed by self.
+
+        :param other: Quaternion
+        :return: Quaternion
+
+        >>> q = Quaternion.from_axis_angle(Vector3D(0, 0, 1), 90)
+        >>> (q * q).rotate(Vector3D(1, 0, 0)).components.round(6)
+        array([-1.,  0.,  0.,  1.])
+        """
+
+        a1, b1, c1, d1 = self.w, self.x, self.y, self.z
+        a2, b2, c2, d2 = other.w, other.x, other.y, other.z
+
+        return type(self)(a1 * a2 - b1 * b2 - c1 * c2 - d1 * d2,
+                          a1 * b2 + b1 * a2 + c1 * d2 - d1 * c2,
+                          a1 * c2 - b1 * d2 + c1 * a2 + d1 * b2,
+                          a1 * d2 + b1 * c2 - c1 * b2 + d1 * a2)
+
+    def conjugate(self) -> 'Quaternion':
+        """The inverse rotation (for unit quaternions)."""
+
+        return type(self)(self.w, -self.x, -self.y, -self.z)
+
+    def dot(self, other: 'Quaternion') -> float:
+        return self.w * other.w + self.x * other.x + self.y * other.y + self.z * other.z
+
+    @property
+    def length(self) -> float:
+        return sqrt(self.dot(self))
+
+    @property
+    def normalized(self) -> 'Quaternion':
+        length = self.length
+        return type(self)(self.w / length, self.x / length, self.y / length, self.z / length)
+
+    def rotate(self, vector):
+        """
+        Rotates a Vector3D or every vector of a Vector3DArray, as v + 2w(u x v) + 2u x (u x v) with u = (x, y, z).
+
+        :param vector: Union[Vector3D, Vector3DArray]
+        :return: Union[Vector3D, Vector3DArray]
+
+        >>> Quaternion.from_axis_angle(Vector3D(0, 0, 1), 90).rotate(Vector3D(1, 0, 0)).components.round(6)
+        array([0., 1., 0., 1.])
+
+        >>> Quaternion.from_axis_angle(Vector3D(0, 1, 0), 90).rotate(Vector3DArray([[1, 0, 0], [0, 0, 1]])).components.round(6)
+        array([[ 0.,  0., -1.,  1.],
+               [ 1.,  0.,  0.,  1.]])
+        """
+
+        u = np.array([self.x, self.y, self.z])
+        v = vector.components[..., :3]
+
+        t = 2 * np.cross(u, v)
+        rotated = v + self.w * t + np.cross(u, t)
+
+        if isinstance(vector, Vector3DArray):
+            return Vector3DArray(rotated, dtype=vector.components.dtype)
+        return Vector3D(*rotated)
+
+    def to_matrix(self):
+        """
+        The 4x4 rotation matrix for row vectors (np.dot(vector, matrix)), as Transform's matrices are used.
+
+        :return: ndarray
+        """
+
+        w, x, y, z = self.w, self.x, self.y, self.z
+        return np.array([[1 - 2 * (y * y + z * z), 2 * (x * y + w * z), 2 * (x * z - w * y), 0],
+                         [2 * (x * y - w * z), 1 - 2 * (x * x + z * z), 2 * (y * z + w * x), 0],
+                         [2 * (x * z + w * y), 2 * (y * z - w * x), 1 - 2 * (x * x + y * y), 0],
+                         [0, 0, 0, 1]])
+
+    def slerp(self, other: 'Quaternion', t: float) -> 'Quaternion':
+        """
+        Spherical linear interpolation from self (t = 0) to other (t = 1) along the shorter arc, at constant speed.
+
+        :param other: Quaternion
+        :param t: float
+        :return: Quaternion
+
+        >>> start, end = Quaternion(), Quaternion.from_axis_angle(Vector3D(0, 1, 0), 90)
+        >>> start.slerp(end, 0.5).to_euler().components.round(6)
+        array([ 0., 45.,  0.,  1.])
+        """
+
+        cosine = self.dot(other)
+        if cosine < 0:  # q and -q are the same rotation, take the one closer to self
+            other, cosine = type(other)(-other.w, -other.x, -other.y, -other.z), -cosine
+
+        if cosine > SLERP_LERP_THRESHOLD:
+            a, b = 1 - t, t
+        else:
+            angle = acos(cosine)
+            a, b = sin((1 - t) * angle) / sin(angle), sin(t * angle) / sin(angle)
+
+        return type(self)(a * self.w + b * other.w,
+                          a * self.x + b * other.x,
+                          a * self.y + b * other.y,
+                          a * self.z + b * other.z).normalized
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -23,6 +23,24 @@ class Vector3D(object):
     def __init__(self, x, y, z, w=1.0, dtype=None):
         self._data = np.array([x, y, z, w], dtype=dtype)
 
+    @classmethod
+    def view(cls, data):
+        """
+        Wraps a 4-element array without copying it, so writes through the vector land in data.
+
+        :param data: ndarray
+        :return: Vector3D
+
+        >>> data = np.zeros(4)
+        >>> Vector3D.view(data).x = 5
+        >>> data
+        array([5., 0., 0., 0.])
+        """
+
+        vector = cls.__new__(cls)
+        vector._data = data
+        return vector
+
     def __repr__(self):
         return 'Vector3D({0}, {1}, {2}, {3})'.format(*self._data)
 
@@ -144,7 +162,12 @@ class Vector3D(object):
         return vector
 
     def _apply_operation(self, operation, value):
-        return type(self)(*OPERATIONS[operation](*(self._data, value._data) if isinstance(value, type(self)) else (self._data, value)))
+        if isinstance(value, Vector3DArray):
+            return NotImplemented  # Vector3DArray's reflected operation broadcasts self over its rows
+
+        vector = type(self)(*OPERATIONS[operation](*(self._data, value._data) if isinstance(value, type(self)) else (self._data, value)))
+        vector.w = 1
+        return vector
 
     def __neg__(self):
         """
@@ -175,11 +198,12 @@ class Vector3D(object):
 
         >>> Vector3D(1.0, 2.0, 3.0) + 5.0
         Vector3D(6.0, 7.0, 8.0, 1.0)
+
+        >>> Vector3D(1, 1, 1) + Vector3DArray([[1, 2, 3], [4, 5, 6]])
+        Vector3DArray([[2.0, 3.0, 4.0, 1.0], [5.0, 6.0, 7.0, 1.0]])
         """
 
-        vector = self._apply_operation("add", value)
-        vector.w = 1
-        return vector
+        return self._apply_operation("add", value)
 
     def __sub__(self, value):
         """
@@ -198,9 +222,7 @@ class Vector3D(object):
         Vector3D(1.0, 2.0, 3.0, 1.0)
         """
 
-        vector = self._apply_operation("sub", value)
-        vector.w = 1
-        return vector
+        return self._apply_operation("sub", value)
 
     def __mul__(self, value):
         """
@@ -219,9 +241,7 @@ class Vector3D(object):
         Vector3D(2.0, 4.0, 6.0, 1.0)
         """
 
-        vector = self._apply_operation("mul", value)
-        vector.w = 1
-        return vector
+        return self._apply_operation("mul", value)
 
     def __truediv__(self, value):
         """
@@ -240,9 +260,7 @@ class Vector3D(object):
         Vector3D(0.5, 1.0, 1.5, 1.0)
         """
 
-        vector = self._apply_operation("div", value)
-        vector.w = 1
-        return vector
+        return self._apply_operation("div", value)
 
     def dot(self, other: 'Vector3D') -> Union[int, float]:
         """
@@ -258,6 +276,8 @@ class Vector3D(object):
         -1.0
         """
 
+        if isinstance(other, Vector3DArray):
+            return other.dot(self)
         return np.dot(self[:3], other[:3])
 
     def cross(self, other):
@@ -269,8 +289,13 @@ class Vector3D(object):
 
         >>> Vector3D(0, 0, 1).cross(Vector3D(1, 0, 0))
         Vector3D(0.0, 1.0, 0.0, 1.0)
+
+        >>> Vector3D(1, 0, 0).cross(Vector3DArray([[0, 0, 1], [0, 1, 0]]))
+        Vector3DArray([[0.0, -1.0, 0.0, 1.0], [0.0, 0.0, 1.0, 1.0]])
         """
 
+        if isinstance(other, Vector3DArray):
+            return type(other)(np.cross(self._data[:3], other._data[:, :3]), dtype=other._data.dtype)
         return type(self)(*np.cross(self._data[:3], other._data[:3]))
 
     def __array__(self, dtype=None):
@@ -294,6 +319,223 @@ Vector3D.forward = Vector3D(0, 0, 1)
 Vector3D.back = Vector3D(0, 0, -1)
 
 
+class Vector3DArray(object):
+    """
+    N homogeneous vectors stored as one contiguous N x 4 array, for math over many vertices at once.
+    Operations match Vector3D's (w of results is reset to 1) but run vectorized over every row.
+    """
+
+    def __init__(self, data, dtype=np.float64):
+        """
+        :param data: N x 3 or N x 4 array-like (w defaults to 1), or an iterable of Vector3D
+
+        >>> Vector3DArray([[1, 2, 3], [4, 5, 6]])
+        Vector3DArray([[1.0, 2.0, 3.0, 1.0], [4.0, 5.0, 6.0, 1.0]])
+
+        >>> Vector3DArray([]).components.shape
+        (0, 4)
+        """
+
+        if not isinstance(data, np.ndarray):
+            data = [vector._data if isinstance(vector, Vector3D) else vector for vector in data]
+
+        data = np.array(data, dtype=dtype, ndmin=2)
+        if data.size == 0:  # [] would otherwise be one row of zero columns
+            data = np.empty((0, 4), dtype=dtype)
+        elif data.shape[1] == 3:
+            data = np.hstack((data, np.ones((len(data), 1), dtype=dtype)))
+        self._data = np.ascontiguousarray(data)
+
+    @classmethod
+    def view(cls, data):
+        """Wraps an N x 4 array without copying it."""
+
+        vectors = cls.__new__(cls)
+        vectors._data = data
+        return vectors
+
+    def __repr__(self):
+        return 'Vector3DArray({0})'.format(self._data.tolist())
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getitem__(self, item):
+        """
+        An integer index gives a Vector3D viewing that row, anything else a Vector3DArray (a view for slices).
+
+        :return: Union[Vector3D, Vector3DArray]
+
+        >>> vectors = Vector3DArray([[1, 2, 3], [4, 5, 6]])
+        >>> vectors[1].x = 10
+        >>> vectors[1]
+        Vector3D(10.0, 5.0, 6.0, 1.0)
+        """
+
+        if isinstance(item, (int, np.integer)):
+            return Vector3D.view(self._data[item])
+        return type(self).view(self._data[item])
+
+    def __setitem__(self, item, value):
+        self._data[item] = value._data if isinstance(value, (Vector3D, Vector3DArray)) else value
+
+    def __iter__(self):
+        return (Vector3D.view(row) for row in self._data)
+
+    def __array__(self, dtype=None):
+        return self._data if dtype is None else self._data.astype(dtype)
+
+    @property
+    def components(self):
+        return self._data
+
+    @property
+    def x(self):
+        return self._data[:, 0]
+
+    @property
+    def y(self):
+        return self._data[:, 1]
+
+    @property
+    def z(self):
+        return self._data[:, 2]
+
+    @property
+    def w(self):
+        return self._data[:, 3]
+
+    @property
+    def length(self):
+        """
+        Magnitudes of every vector.
+
+        :return: ndarray
+
+        >>> Vector3DArray([[3, 4, 0], [0, 0, 2]]).length
+        array([5., 2.])
+        """
+
+        return np.sqrt(np.einsum("ij,ij->i", self._data[:, :3], self._data[:, :3]))
+
+    @property
+    def normalized(self):
+        """
+        :return: Vector3DArray
+
+        >>> Vector3DArray([[3, 4, 0], [0, 0, 2]]).normalized
+        Vector3DArray([[0.6, 0.8, 0.0, 1.0], [0.0, 0.0, 1.0, 1.0]])
+        """
+
+        data = self._data / self.length[:, None]
+        data[:, 3] = 1
+        return type(self).view(data)
+
+    def _apply_operation(self, operation, value, reflected=False):
+        if isinstance(value, (Vector3DArray, Vector3D)):
+            value = value._data
+        value = np.asarray(value, dtype=self._data.dtype)  # Keeps float32 vertices float32; broadcasts like NumPy
+
+        data = OPERATIONS[operation](*(value, self._data) if reflected else (self._data, value))
+        data[:, 3] = 1
+        return type(self).view(data)
+
+    def __neg__(self):
+        data = -self._data
+        data[:, 3] = 1
+        return type(self).view(data)
+
+    def __add__(self, value):
+        """
+        Adds a Vector3DArray (row by row), a Vector3D or a scalar (to every row), and returns a Vector3DArray.
+
+        :param value: Union[Vector3DArray, Vector3D, int, float]
+        :return: Vector3DArray
+
+        >>> Vector3DArray([[1, 2, 3], [4, 5, 6]]) + Vector3D(1, 1, 1)
+        Vector3DArray([[2.0, 3.0, 4.0, 1.0], [5.0, 6.0, 7.0, 1.0]])
+        """
+
+        return self._apply_operation("add", value)
+
+    def __sub__(self, value):
+        return self._apply_operation("sub", value)
+
+    def __mul__(self, value):
+        """
+        Operands broadcast like NumPy: a flat sequence applies per component (x, y, z, w) for any number of rows,
+        scalars per row need the explicit N x 1 shape.
+
+        :param value: Union[Vector3DArray, Vector3D, int, float, ndarray]
+        :return: Vector3DArray
+
+        >>> Vector3DArray([[1, 2, 3], [4, 5, 6]]) * [[2], [0.5]]
+        Vector3DArray([[2.0, 4.0, 6.0, 1.0], [2.0, 2.5, 3.0, 1.0]])
+
+        >>> Vector3DArray([[1, 2, 3]]) * [1, 2, 3, 1]
+        Vector3DArray([[1.0, 4.0, 9.0, 1.0]])
+        """
+
+        return self._apply_operation("mul", value)
+
+    def __truediv__(self, value):
+        return self._apply_operation("div", value)
+
+    def __rsub__(self, value):
+        """
+        :param value: Union[Vector3D, int, float, ndarray]
+        :return: Vector3DArray
+
+        >>> Vector3D(1, 1, 1) - Vector3DArray([[1, 2, 3]], dtype=np.float32)
+        Vector3DArray([[0.0, -1.0, -2.0, 1.0]])
+        """
+
+        return self._apply_operation("sub", value, reflected=True)
+
+    def __rtruediv__(self, value):
+        return self._apply_operation("div", value, reflected=True)
+
+    __radd__ = __add__
+    __rmul__ = __mul__
+
+    def dot(self, other):
+        """
+        Row-wise dot products with a Vector3DArray, or of every row with one Vector3D.
+
+        :param other: Union[Vector3DArray, Vector3D]
+        :return: ndarray
+
+        >>> Vector3DArray([[1, 0, 0], [0, 2, 0]]).dot(Vector3D(1, 1, 0))
+        array([1., 2.])
+        """
+
+        return np.einsum("ij,ij->i", self._data[:, :3], np.broadcast_to(other._data[..., :3], self._data[:, :3].shape))
+
+    def cross(self, other):
+        """
+        :param other: Union[Vector3DArray, Vector3D]
+        :return: Vector3DArray
+
+        >>> Vector3DArray([[0, 0, 1], [1, 0, 0]]).cross(Vector3D(1, 0, 0))
+        Vector3DArray([[0.0, 1.0, 0.0, 1.0], [0.0, 0.0, 0.0, 1.0]])
+        """
+
+        return type(self)(np.cross(self._data[:, :3], other._data[..., :3]), dtype=self._data.dtype)
+
+    def transform(self, matrix):
+        """
+        Every vector times a 4 x 4 matrix (row vectors, like np.dot(vector, matrix) for a Vector3D), as one matmul.
+
+        :param matrix: ndarray
+        :return: Vector3DArray
+
+        >>> Vector3DArray([[1, 2, 3]]).transform(np.diag([2, 2, 2, 1]))
+        Vector3DArray([[2.0, 4.0, 6.0, 1.0]])
+        """
+
+        return type(self).view(self._data @ np.asarray(matrix, dtype=self._data.dtype))
+
+
 def dot(a, b):
     return np.dot(a, b)
 
@@ -0,0 +1,134 @@
+import argparse
+import fnmatch
+import json
+import os
+import sys
+import tracemalloc
+from statistics import median, quantiles
+from time import perf_counter_ns
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+THRESHOLD = 0.10  # Relative slowdown of the median that counts as a regression
+
+BENCHMARKS = {}  # Name -> Benchmark, in registration order
+
+
+class BenchmarkRegression(Exception):
+	pass
+
+
+class Benchmark:
+	def __init__(self, name, func, suite, setup=None, warmup=3, repetitions=20, memory=False):
+		self.name = name
+		self.func = func
+		self.suite = suite
+		self.setup = setup
+		self.warmup = warmup
+		self.repetitions = repetitions
+		self.memory = memory
+
+	def _run_once(self):
+		args = self.setup() if self.setup is not None else ()
+
+		ts = perf_counter_ns()
+		self.func(*args)
+		return perf_counter_ns() - ts
+
+	def run(self, repetitions=None):
+		"""Times the case after its warmup runs, returning median and interquartile range in seconds."""
+		for _ in range(self.warmup):
+			self._run_once()
+
+		samples = [self._run_once() / 1e9 for _ in range(repetitions or self.repetitions)]
+		q1, _, q3 = quantiles(samples, n=4) if len(samples) > 1 else (samples[0],) * 3
+
+		result = {"median": median(samples), "iqr": q3 - q1, "repetitions": len(samples)}
+
+		if self.memory:  # One extra, untimed run since tracing allocations slows it down
+			args = self.setup() if self.setup is not None else ()
+			tracemalloc.start()
+			try:
+				self.func(*args)
+				result["peak"] = tracemalloc.get_traced_memory()[1]
+			finally:
+				tracemalloc.stop()
+
+		return result
+
+
+def benchmark(suite, name=None, setup=None, warmup=3, repetitions=20, memory=False):
+	"""
+	Registers the decorated function as a benchmark case named "<suite>.<name>".
+	setup (if given) is called before every run, untimed, and its return value is passed as the arguments.
+	memory=True also records the peak traced allocation of one run.
+	"""
+	def register(func):
+		case = Benchmark(f"{suite}.{name or func.__name__}", func, suite, setup, warmup, repetitions, memory)
+		BENCHMARKS[case.name] = case
+		return func
+
+	return register
+
+
+def run(pattern="*", repetitions=None, file=None):
+	"""Runs every registered case whose name matches the glob pattern and returns {name: result}."""
+	results = {}
+	for name, case in BENCHMARKS.items():
+		if fnmatch.fnmatch(name, pattern):
+			results[name] = result = case.run(repetitions)
+			peak = f"   peak {result['peak'] / 2 ** 20:>10.3f} MB" if "peak" in result else ""
+			print(f"{name:<45} median {result['median'] * 1e3:>12.3f} ms   iqr {result['iqr'] * 1e3:>10.3f} ms{peak}", file=file or sys.stdout)
+
+	return results
+
+
+def save_baseline(results, path=BASELINE_PATH):
+	baseline = load_baseline(path) if os.path.exists(path) else {}
+	baseline.update(results)
+
+	with open(path, "w") as file:
+		json.dump(baseline, file, indent=4, sort_keys=True)
+
+
+def load_baseline(path=BASELINE_PATH):
+	with open(path) as file:
+		return json.load(file)
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+	"""Raises BenchmarkRegression listing every case whose median grew by more than threshold over the baseline."""
+	lines = []
+	for name, result in results.items():
+		if name not in baseline:
+			continue
+
+		before, after = baseline[name]["median"], result["median"]
+		change = after / before - 1 if before else 0.0
+		if change > threshold:
+			lines.append(f"  {name}: {before * 1e3:.3f} ms -> {after * 1e3:.3f} ms ({change:+.1%}, limit {threshold:+.0%})")
+
+	if lines:
+		raise BenchmarkRegression("Benchmarks regressed past the baseline:\n" + "\n".join(lines))
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Run the registered benchmark cases.")
+	parser.add_argument("pattern", nargs="?", default="*", help="glob over case names, e.g. 'sieve.*'")
+	parser.add_argument("--repetitions", type=int, default=None)
+	parser.add_argument("--baseline", default=BASELINE_PATH)
+	parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+	parser.add_argument("--compare", action="store_true", help="fail if a case regressed against the baseline")
+	parser.add_argument("--threshold", type=float, default=THRESHOLD)
+	args = parser.parse_args(argv)
+
+	results = run(args.pattern, args.repetitions)
+
+	if args.compare:
+		try:
+			compare(results, load_baseline(args.baseline), args.threshold)
+		except BenchmarkRegression as error:
+			print(error, file=sys.stderr)
+			sys.exit(1)
+
+	if args.save:
+		save_baseline(results, args.baseline)
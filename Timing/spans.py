@@ -0,0 +1,144 @@
+import sys
+from contextvars import ContextVar
+from functools import wraps
+from inspect import iscoroutinefunction
+from time import perf_counter_ns
+
+
+class SpanNode:
+	"""One node of the call tree: every entry of the same span name under the same parent path."""
+
+	__slots__ = ("name", "children", "calls", "inclusive")
+
+	def __init__(self, name):
+		self.name = name
+		self.children = {}
+		self.calls = 0
+		self.inclusive = 0  # ns
+
+	def child(self, name):
+		node = self.children.get(name)
+		if node is None:
+			node = self.children[name] = SpanNode(name)
+		return node
+
+	@property
+	def self_time(self):
+		# Concurrent children (gathered coroutines) can add up to more than their parent's wall time
+		return max(self.inclusive - sum(child.inclusive for child in self.children.values()), 0)
+
+	def walk(self, path=()):
+		"""Yields (path, node) for every node below this one, depth first."""
+		for child in self.children.values():
+			childPath = path + (child.name,)
+			yield childPath, child
+			yield from child.walk(childPath)
+
+
+ROOT = SpanNode("<root>")
+
+_active = ContextVar("active_spans", default=())  # The nodes currently entered in this thread / task
+
+
+class Span:
+	"""
+	Times a block as a node of the call tree, usable as `with Span(name):` or as a decorator.
+	Entering the name of the innermost active span (direct recursion) reuses that node instead of nesting a new one.
+	Indirect recursion nests normally, so every node's time is inside its parent's and the self times add up.
+
+	>>> @span("f")
+	... def f(n):
+	... 	return f(n - 1) if n else None
+	>>> @span("a")
+	... def a(n):
+	... 	b(n)
+	>>> @span("b")
+	... def b(n):
+	... 	if n:
+	... 		a(n - 1)
+	>>> reset_spans()
+	>>> f(3), a(1)
+	(None, None)
+	>>> [(";".join(path), node.calls) for path, node in ROOT.walk()]
+	[('f', 4), ('a', 1), ('a;b', 1), ('a;b;a', 1), ('a;b;a;b', 1)]
+	>>> sum(node.self_time for _, node in ROOT.walk()) == sum(node.inclusive for node in ROOT.children.values())
+	True
+	"""
+
+	def __init__(self, name):
+		self.name = name
+
+	def __enter__(self):
+		active = _active.get()
+		parent = active[-1] if active else ROOT
+
+		# Only direct recursion collapses: folding A -> B -> A onto the outer A would count its time under B too
+		self._recursive = parent.name == self.name and parent is not ROOT
+		self._node = parent if self._recursive else parent.child(self.name)
+
+		self._token = _active.set(active + (self._node,))
+		self._start = perf_counter_ns()
+		return self
+
+	def __exit__(self, *exc):
+		elapsed = perf_counter_ns() - self._start
+		_active.reset(self._token)
+
+		self._node.calls += 1
+		if not self._recursive:  # The outermost activation already covers the time of the recursive ones
+			self._node.inclusive += elapsed
+
+	def __call__(self, f):
+		name = self.name
+
+		if iscoroutinefunction(f):
+			@wraps(f)
+			async def wrap(*args, **kw):
+				with Span(name):
+					return await f(*args, **kw)
+		else:
+			@wraps(f)
+			def wrap(*args, **kw):
+				with Span(name):
+					return f(*args, **kw)
+
+		return wrap
+
+
+def span(nameOrFunc):
+	"""@span, @span(name) or `with span(name):`."""
+	if callable(nameOrFunc):
+		return Span(nameOrFunc.__qualname__)(nameOrFunc)
+	return Span(nameOrFunc)
+
+
+def reset_spans():
+	ROOT.children.clear()
+
+
+def report_spans(file=None):
+	"""Prints the call tree with calls, inclusive and self time per node."""
+	print(f"{'span':<60} {'calls':>10} {'incl ms':>12} {'self ms':>12}", file=file or sys.stdout)
+	for path, node in ROOT.walk():
+		label = "  " * (len(path) - 1) + node.name
+		print(f"{label:<60} {node.calls:>10} {node.inclusive / 1e6:>12.3f} {node.self_time / 1e6:>12.3f}", file=file or sys.stdout)
+
+
+def export_folded(path=None):
+	"""
+	The tree as folded stacks ("a;b;c <self time in us>" per line), the input format of flamegraph.pl
+	and speedscope. Also written to path if one is given.
+	"""
+	lines = [f"{';'.join(stack)} {node.self_time // 1000}" for stack, node in ROOT.walk() if node.self_time >= 1000]
+	text = "\n".join(lines) + "\n" if lines else ""
+
+	if path is not None:
+		with open(path, "w") as file:
+			file.write(text)
+
+	return text
+
+
+if __name__ == '__main__':
+	import doctest
+	doctest.testmod()
@@ -0,0 +1,235 @@
+import os
+import sys
+from random import Random
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for directory in (ROOT, os.path.join(ROOT, "Prime Numbers"), os.path.join(ROOT, "Projection")):
+	if directory not in sys.path:
+		sys.path.append(directory)
+
+from Fractions.fraction_array import FractionArray
+from Fractions.fractions import Fraction
+from LinearAlgebra.main import LUFactorization, bareiss_determinant, gauss_eliminate, laplace_determinant, lu_slogdet, \
+	rational_determinant
+from LinearAlgebra.matrix import Matrix
+from LinearAlgebra.modular import modular_determinant, modular_solve
+from LinearAlgebra.sparse import SparseMatrix
+from Timing.benchmark import benchmark, main
+from prime import PrimeStream, _primes, count_primes
+from projection import Camera, Mesh, Transform
+from quaternion import Quaternion
+from vector3d import Vector3D, Vector3DArray
+
+
+# Sieve
+
+@benchmark("sieve", repetitions=10)
+def primes_10_7():
+	_primes(10 ** 7)
+
+
+@benchmark("sieve", repetitions=10)
+def count_primes_10_8():
+	count_primes(10 ** 8)
+
+
+@benchmark("sieve", repetitions=10)
+def stream_10_4_after_10_12():
+	stream = PrimeStream(10 ** 12)
+	for _ in range(10 ** 4):
+		next(stream)
+
+
+# Fraction arithmetic
+
+def _random_fractions(count=2000, seed=0):
+	rng = Random(seed)
+	return ([Fraction(rng.randint(-1000, 1000), rng.randint(1, 1000)) for _ in range(count)],)
+
+
+@benchmark("fraction", setup=_random_fractions)
+def sum_2000(fractions):
+	total = Fraction(0)
+	for fraction in fractions:
+		total = total + fraction
+
+
+def _random_pairs(count, seed=0):
+	rng = Random(seed)
+	return ([(rng.randint(-1000, 1000), rng.randint(1, 32)) for _ in range(count)],)  # Small denominators bound the sum's lcm
+
+
+@benchmark("fraction", setup=lambda: _random_pairs(10 ** 6), warmup=0, repetitions=3, memory=True)
+def sum_10_6(pairs):
+	fractions = [Fraction(numerator, denominator) for numerator, denominator in pairs]
+
+	total = Fraction(0)
+	for fraction in fractions:
+		total = total + fraction
+
+
+@benchmark("fraction", setup=_random_fractions)
+def mul_div_2000(fractions):
+	for a, b in zip(fractions, fractions[1:]):
+		a * b / (b * b + 1)
+
+
+@benchmark("fraction", setup=_random_fractions)
+def compare_hash_2000(fractions):
+	sorted(fractions)
+	set(fractions)
+
+
+def _random_fraction_arrays(shape=(500, 500), seed=0):
+	rng = Random(seed)
+	return tuple(FractionArray([[rng.randint(-1000, 1000) for _ in range(shape[1])] for _ in range(shape[0])],
+	                           [[rng.randint(1, 1000) for _ in range(shape[1])] for _ in range(shape[0])]) for _ in range(2))
+
+
+@benchmark("fraction", setup=_random_fraction_arrays, warmup=1, repetitions=5)
+def array_add_mul_500x500(a, b):
+	a + b
+	a * b
+
+
+# Gaussian elimination
+
+def _random_system(n=25, seed=0):
+	rng = Random(seed)
+	matrix = [[rng.randint(-10, 10) for _ in range(n + 1)] for _ in range(n)]
+	for i in range(n):
+		matrix[i][i] = 11 * n  # Diagonally dominant, so elimination never meets a zero pivot
+
+	return (matrix,)
+
+
+@benchmark("elimination", setup=_random_system, repetitions=10)
+def gauss_eliminate_25(matrix):
+	gauss_eliminate(matrix)
+
+
+@benchmark("elimination", setup=_random_system, repetitions=10)
+def lu_solve_25_rhs_25(matrix):
+	factorization = LUFactorization([row[:-1] for row in matrix])
+	for j in range(25):
+		factorization.solve([row[-1] + j for row in matrix])
+
+
+def _tridiagonal(n=10 ** 4):
+	matrix = SparseMatrix((n, n))
+	for i in range(n):
+		matrix[i, i] = 4.0
+		if i:
+			matrix[i, i - 1] = matrix[i - 1, i] = -1.0
+
+	return matrix, [1.0] * n
+
+
+@benchmark("elimination", setup=_tridiagonal, warmup=1, repetitions=5)
+def sparse_tridiagonal_10_4(matrix, rhs):
+	matrix.solve(rhs, exact=False)
+
+
+@benchmark("elimination", setup=lambda: _random_square(101), warmup=1, repetitions=5)
+def modular_solve_100(matrix):
+	modular_solve([row[:-1] for row in matrix[:-1]], matrix[-1][:-1])
+
+
+# Determinants
+
+def _random_square(n, seed=0):
+	rng = Random(seed)
+	return ([[rng.randint(-10, 10) for _ in range(n)] for _ in range(n)],)
+
+
+@benchmark("determinant", setup=lambda: _random_square(7), repetitions=10)
+def laplace_7(matrix):
+	laplace_determinant(matrix)
+
+
+@benchmark("determinant", setup=lambda: _random_square(100), repetitions=5)
+def bareiss_int_100(matrix):
+	bareiss_determinant(matrix)
+
+
+@benchmark("determinant", setup=lambda: _random_square(200), warmup=1, repetitions=3)
+def bareiss_int_200(matrix):
+	bareiss_determinant(matrix)
+
+
+@benchmark("determinant", setup=lambda: _random_square(200), warmup=1, repetitions=3)
+def modular_int_200(matrix):
+	modular_determinant(matrix)
+
+
+@benchmark("determinant", setup=lambda: ([[Fraction(x, 1 + abs(x) % 7) for x in row] for row in _random_square(50)[0]],), repetitions=5)
+def rational_50(matrix):
+	rational_determinant(matrix)
+
+
+@benchmark("determinant", setup=lambda: _random_square(500))
+def lu_float_500(matrix):
+	lu_slogdet(matrix)  # |det| is about e ** 2200, far past the float range that lu_determinant returns in
+
+
+# Matrix multiplication
+
+@benchmark("matrix", setup=lambda: (Matrix([[x * 2 ** 64 + 1 for x in row] for row in _random_square(128)[0]]),), warmup=0, repetitions=3)
+def exact_strassen_128(matrix):
+	matrix @ matrix.T
+
+
+@benchmark("matrix", setup=lambda: (Matrix([[float(x) for x in row] for row in _random_square(500)[0]]),))
+def float_500(matrix):
+	matrix @ matrix.T
+
+
+# Projection pipeline
+
+def _camera():
+	"""A camera at the same pose for every run, since move_camera and rotate_camera move theirs."""
+	return Camera(Transform(Vector3D(0, 0, 5), Vector3D(0, 0, 0), Vector3D(1, 1, 1)))
+
+
+def _random_mesh(count=2000, seed=0):
+	rng = Random(seed)
+	vertices = [Vector3D(rng.uniform(-1, 1), rng.uniform(-1, 1), rng.uniform(-1, 1)) for _ in range(count)]
+
+	return Mesh(vertices, Transform(Vector3D(0, 0, 0), Vector3D(0, 0, 0), Vector3D(1, 1, 1)))
+
+
+_mesh = _random_mesh()  # Shared: projecting never changes it, and its vertex array is stacked once
+
+
+@benchmark("projection", setup=lambda: (_camera(), _mesh))
+def project_2000(camera, mesh):
+	camera.project(mesh)
+
+
+@benchmark("projection", setup=lambda: (_camera(), Mesh(Vector3DArray([[i % 7 - 3, i % 11 - 5, i % 13 - 6] for i in range(10 ** 5)]), _mesh.transform)))
+def project_10_5(camera, mesh):
+	camera.project(mesh, (800, 800), clip=True)
+
+
+@benchmark("projection", setup=lambda: (Vector3DArray([[i % 7, i % 11, i % 13] for i in range(10 ** 6)]), _camera().transform.worldToLocalMatrix), warmup=1, repetitions=10)
+def transform_10_6(vertices, matrix):
+	vertices.transform(matrix)
+
+
+@benchmark("projection", setup=lambda: (_camera().transform,))
+def move_camera(transform):
+	for _ in range(100):
+		transform.position += transform.forward * 0.01
+
+
+@benchmark("projection", setup=lambda: (_camera().transform,))
+def rotate_camera(transform):
+	step = Quaternion.from_axis_angle(Vector3D(0, 1, 0), 0.5)
+	for _ in range(100):
+		transform.rotate_by(step)
+		transform.forward
+		transform.worldToLocalMatrix
+
+
+if __name__ == '__main__':
+	main()